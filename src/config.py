@@ -123,14 +123,63 @@ class ConfigManager:
         # MQTT Broker Process
         self.active_config['mqtt_broker']['process']['name'] = 'Notepad.exe'
         self.active_config['mqtt_broker']['process']['service_wd_period_seconds'] = 10
+        # Scheduler - job intervals, 0 disables a job; the process check uses service_wd_period_seconds
+        self.active_config['scheduler']['late_tolerance_seconds'] = 0.5
+        self.active_config['scheduler']['status_view_seconds'] = 10
+        self.active_config['scheduler']['stats_seconds'] = 1
+        self.active_config['scheduler']['topic_list_seconds'] = 300
+        self.active_config['scheduler']['topic_list_changed_seconds'] = 5
+        self.active_config['scheduler']['topic_eviction_seconds'] = 10
+        self.active_config['scheduler']['recorder_flush_seconds'] = 5
+        self.active_config['scheduler']['connection_check_seconds'] = 10
         # MQTT Topic Watchdog Values
         self.active_config['topic_watchdog']['all']['max_time_seconds'] = 3600
         self.active_config['topic_watchdog']['amiweather/8/temperature']['max_time_seconds'] = 60
+        # MQTT Topic Watchdog Events - edge-triggered transitions with a periodic full list for reconciliation
+        self.active_config['watchdog_events']['recovery_hold_seconds'] = 30
+        self.active_config['watchdog_events']['reconciliation_period_seconds'] = 300
+        # MQTT Topic Tracker Limits (0 = unlimited)
+        self.active_config['topic_tracker']['max_topics'] = 0
+        self.active_config['topic_tracker']['max_memory_bytes'] = 0
+        self.active_config['topic_tracker']['dormant_eviction_seconds'] = 0
+        self.active_config['topic_tracker']['aggregate_filters'] = []
+        # Heavy Hitters - top talkers over sliding windows built from bucket_seconds buckets
+        self.active_config['heavy_hitters']['enabled'] = True
+        self.active_config['heavy_hitters']['capacity'] = 256
+        self.active_config['heavy_hitters']['top_k'] = 10
+        self.active_config['heavy_hitters']['bucket_seconds'] = 10
+        self.active_config['heavy_hitters']['window_seconds'] = [60, 600]
+        # Console Status View
+        self.active_config['status_view']['top_n'] = 10
+        self.active_config['status_view']['min_period_seconds'] = 0
+        self.active_config['status_view']['full_dump_every_n_renders'] = 0
+        self.active_config['status_view']['full_dump_signal'] = 'SIGUSR2'
+        # Traffic Recorder - payload_mode is 'none', 'hash' or 'payload'
+        self.active_config['recorder']['enabled'] = False
+        self.active_config['recorder']['output_folder'] = 'recordings'
+        self.active_config['recorder']['payload_mode'] = 'hash'
+        self.active_config['recorder']['buffer_bytes'] = 1048576
         # Publish Topics
         self.active_config['publish']['base_topic'] = 'sc_mqtt_broker/'
+        # Document encoding is 'json', 'json_compact', 'zlib_json' or 'cbor'; page_size 0 publishes one document
+        self.active_config['publish']['encoding'] = 'json'
+        self.active_config['publish']['page_size'] = 0
+        self.active_config['publish']['include_payloads'] = True
         self.active_config['publish']['process_stats'] = 'process_stats'
         self.active_config['publish']['topic_list'] = 'topic_list'
         self.active_config['publish']['watchdog_topics'] = 'watchdog_topics'
+        self.active_config['publish']['watchdog_events'] = 'watchdog_events'
+        self.active_config['publish']['command'] = 'command'
+        self.active_config['publish']['profile_summary'] = 'profile_summary'
+        # On-demand Profiler
+        self.active_config['profiler']['enabled'] = True
+        self.active_config['profiler']['signal'] = 'SIGUSR1'
+        self.active_config['profiler']['default_seconds'] = 30
+        self.active_config['profiler']['max_seconds'] = 300
+        self.active_config['profiler']['sample_interval_seconds'] = 0.005
+        self.active_config['profiler']['tracemalloc_frames'] = 1
+        self.active_config['profiler']['top_n'] = 25
+        self.active_config['profiler']['output_folder'] = 'profiles'
 
     '''
     Recursively convert all defaultdicts to dicts; useful for JSON serialization
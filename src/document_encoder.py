@@ -0,0 +1,178 @@
+import json
+import struct
+import zlib
+import config
+
+'''
+Encodes the sentinel's published documents in the configured encoding:
+    json         - the original format; topic -> [last time, delta seconds, str(payload)]
+    json_compact - minimal separators and no payloads; topic -> [last time, delta seconds]
+    zlib_json    - compact json compressed with zlib
+    cbor         - binary CBOR (RFC 8949); payloads are kept as raw bytes
+Topic documents are encoded entry by entry from an iterator, without building an intermediate dict, and can
+be split into pages of page_size entries.
+'''
+class DocumentEncoder:
+
+    # Public Class Constants
+    ENCODINGS = ('json', 'json_compact', 'zlib_json', 'cbor')
+
+    # Private Class Constants
+    _COMPACT_JSON = json.JSONEncoder(separators=(',', ':'))
+    _CBOR_FLOAT = struct.Struct('>Bd')
+
+    '''
+    Initialize the encoder from the publish config. Raises ValueError for an unknown encoding.
+    '''
+    def __init__(self, app_config : config.ConfigManager, encoding : str = None, page_size : int = None) -> None:
+        publish_config = app_config.active_config['publish']
+        self._encoding = encoding if encoding is not None else publish_config['encoding']
+        self._page_size = page_size if page_size is not None else publish_config['page_size']
+        self._include_payloads = publish_config['include_payloads'] and self._encoding != 'json_compact'
+        if self._encoding not in self.ENCODINGS:
+            raise ValueError(f"Unknown publish encoding '{self._encoding}'; expected one of {self.ENCODINGS}")
+
+    '''
+    Returns the encoding name
+    '''
+    def get_encoding(self) -> str:
+        return self._encoding
+
+    '''
+    Returns true/false if documents are split into pages
+    '''
+    def is_paged(self) -> bool:
+        return self._page_size > 0
+
+    '''
+    Encode (topic, last time iso, delta seconds, payload) entries as one document, or one per page when paged.
+    Entries are encoded as they are read; yields (document, entry count) so each page can be published before
+    the next is built.
+    '''
+    def encode_entries(self, entries):
+        page = self._new_page()
+        entry_count = 0
+        page_count = 0
+        for entry in entries:
+            self._add_page_entry(page, entry_count == 0, entry)
+            entry_count += 1
+            if self._page_size > 0 and entry_count >= self._page_size:
+                yield (self._finish_page(page), entry_count)
+                page = self._new_page()
+                entry_count = 0
+                page_count += 1
+        if entry_count > 0 or page_count == 0:
+            yield (self._finish_page(page), entry_count)
+
+    '''
+    Encode a small document (e.g. stats, watchdog events) in the configured encoding - never paged
+    '''
+    def encode_document(self, document : dict):
+        if self._encoding == 'json':
+            return json.dumps(document)
+        if self._encoding == 'cbor':
+            out = bytearray()
+            self._cbor_encode(document, out)
+            return bytes(out)
+        json_string = self._COMPACT_JSON.encode(document)
+        if self._encoding == 'zlib_json':
+            return zlib.compress(json_string.encode('utf8'))
+        return json_string
+
+    '''
+    Start a page - [output chunks or CBOR buffer, zlib compressor or None]
+    '''
+    def _new_page(self) -> list:
+        if self._encoding == 'cbor':
+            return [bytearray(b'\xbf'), None]  # indefinite length map
+        if self._encoding == 'zlib_json':
+            compressor = zlib.compressobj()
+            return [[compressor.compress(b'{')], compressor]
+        return [['{'], None]
+
+    '''
+    Append one topic entry to a page
+    '''
+    def _add_page_entry(self, page : list, is_first : bool, entry : tuple) -> None:
+        (topic, last_time_iso, delta_seconds, payload) = entry
+        if self._encoding == 'cbor':
+            self._cbor_encode(topic, page[0])
+            self._cbor_encode([last_time_iso, delta_seconds, payload] if self._include_payloads else [last_time_iso, delta_seconds], page[0])
+            return
+        value = [last_time_iso, delta_seconds, str(payload)] if self._include_payloads else [last_time_iso, delta_seconds]
+        if self._encoding == 'json':
+            text = ('' if is_first else ', ') + json.dumps(topic) + ': ' + json.dumps(value)
+        else:
+            text = ('' if is_first else ',') + self._COMPACT_JSON.encode(topic) + ':' + self._COMPACT_JSON.encode(value)
+        if page[1] is not None:
+            page[0].append(page[1].compress(text.encode('utf8')))
+        else:
+            page[0].append(text)
+
+    '''
+    Close a page and return the encoded document
+    '''
+    def _finish_page(self, page : list):
+        if self._encoding == 'cbor':
+            page[0].append(0xff)
+            return bytes(page[0])
+        if page[1] is not None:
+            page[0].append(page[1].compress(b'}'))
+            page[0].append(page[1].flush())
+            return b''.join(page[0])
+        page[0].append('}')
+        return ''.join(page[0])
+
+    '''
+    Append the CBOR encoding of a value (dict, list, tuple, str, bytes, int, float, bool, None) to out
+    '''
+    def _cbor_encode(self, value, out : bytearray) -> None:
+        if isinstance(value, str):
+            encoded = value.encode('utf8')
+            self._cbor_head(3, len(encoded), out)
+            out += encoded
+        elif isinstance(value, bool):
+            out.append(0xf5 if value else 0xf4)
+        elif isinstance(value, int):
+            if value >= 0:
+                self._cbor_head(0, value, out)
+            else:
+                self._cbor_head(1, -1 - value, out)
+        elif isinstance(value, float):
+            out += self._CBOR_FLOAT.pack(0xfb, value)
+        elif isinstance(value, (bytes, bytearray)):
+            self._cbor_head(2, len(value), out)
+            out += value
+        elif value is None:
+            out.append(0xf6)
+        elif isinstance(value, (list, tuple)):
+            self._cbor_head(4, len(value), out)
+            for item in value:
+                self._cbor_encode(item, out)
+        elif isinstance(value, dict):
+            self._cbor_head(5, len(value), out)
+            for (key, item) in value.items():
+                self._cbor_encode(key, out)
+                self._cbor_encode(item, out)
+        else:
+            self._cbor_encode(str(value), out)
+
+    '''
+    Append a CBOR major type and argument to out
+    '''
+    def _cbor_head(self, major_type : int, argument : int, out : bytearray) -> None:
+        major = major_type << 5
+        if argument < 24:
+            out.append(major | argument)
+        elif argument < 0x100:
+            out.append(major | 24)
+            out.append(argument)
+        elif argument < 0x10000:
+            out.append(major | 25)
+            out += argument.to_bytes(2, 'big')
+        elif argument < 0x100000000:
+            out.append(major | 26)
+            out += argument.to_bytes(4, 'big')
+        else:
+            out.append(major | 27)
+            out += argument.to_bytes(8, 'big')
@@ -0,0 +1,83 @@
+import argparse
+import time
+import config
+import document_encoder
+import logger
+import mqtt_topic_tracker
+
+'''
+Compares published size and encode time of the topic list for each document encoding against the original
+get_json_topic_list
+'''
+class EncodingBenchmark:
+
+    # Private Class Constants
+    _log_key = 'benchmark'
+
+    '''
+    Initialize the benchmark with a tracker holding topic_count synthetic topics
+    '''
+    def __init__(self,
+                 app_config : config.ConfigManager,
+                 app_logger : logger.Logger,
+                 topic_count : int,
+                 payload_size : int) -> None:
+
+        # Locals
+        self._logger = app_logger
+        self._app_config = app_config
+        self._topic_count = topic_count
+        self._topic_tracker = mqtt_topic_tracker.MqttTopicTracker(app_config, app_logger)
+        payload = b'x' * payload_size
+        for i in range(topic_count):
+            self._topic_tracker.new_topic_data_received(f"site/{i % 100}/device/{i}/state", payload)
+
+    '''
+    Run every encoding repeat times and print the best time and total size of each
+    '''
+    def run(self, repeat : int, page_size : int) -> None:
+        rows = list()
+        rows.append(self._measure("get_json_topic_list", repeat, lambda: [self._topic_tracker.get_json_topic_list()]))
+        for encoding in document_encoder.DocumentEncoder.ENCODINGS:
+            encoder = document_encoder.DocumentEncoder(self._app_config, encoding, page_size)
+            rows.append(self._measure(encoding, repeat, lambda: [document for (document, entry_count) in encoder.encode_entries(self._topic_tracker.iter_topic_entries())]))
+
+        self._logger.write(self._log_key, f"{self._topic_count} topics, page size {page_size}, best of {repeat}", logger.MessageLevel.INFO)
+        self._logger.write(self._log_key, f"{'encoding':<22} {'pages':>6} {'bytes':>12} {'ms':>10}", logger.MessageLevel.INFO)
+        for (name, page_count, size, seconds) in rows:
+            self._logger.write(self._log_key, f"{name:<22} {page_count:>6} {size:>12} {seconds * 1000:>10.1f}", logger.MessageLevel.INFO)
+
+    '''
+    Time one encoding - returns (name, pages, total bytes, best seconds)
+    '''
+    def _measure(self, name : str, repeat : int, encode) -> tuple:
+        best_seconds = None
+        for i in range(repeat):
+            started = time.perf_counter()
+            documents = encode()
+            seconds = time.perf_counter() - started
+            best_seconds = seconds if best_seconds is None else min(best_seconds, seconds)
+        size = sum(len(document.encode('utf8')) if isinstance(document, str) else len(document) for document in documents)
+        return (name, len(documents), size, best_seconds)
+
+'''
+Benchmark Entry Point
+'''
+if __name__ == '__main__':
+
+    # Initialize the logger
+    app_logger = logger.Logger()
+    app_logger._mute_list.append('topic_tracker')
+
+    # Parse Arguments
+    arg_parser = argparse.ArgumentParser(
+                        prog='MQTT Broker Sentinel Encoding Benchmark',
+                        description='Compares size and time of the published document encodings.')
+    arg_parser.add_argument('-t', '--topics', type=int, default=50000)                  # Synthetic topic count
+    arg_parser.add_argument('-p', '--payload-size', type=int, default=64)               # Payload bytes per topic
+    arg_parser.add_argument('-r', '--repeat', type=int, default=3)                      # Runs per encoding
+    arg_parser.add_argument('--page-size', type=int, default=0)                         # Entries per page, 0 = one document
+    args = arg_parser.parse_args()
+
+    app_config = config.ConfigManager("mqtt-broker-sentinel.json", app_logger)
+    EncodingBenchmark(app_config, app_logger, args.topics, args.payload_size).run(args.repeat, args.page_size)
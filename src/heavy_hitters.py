@@ -0,0 +1,129 @@
+import datetime
+import heapq
+import threading
+import config
+
+'''
+Space-Saving top-k counter with a fixed number of counters. Incrementing a counted key is O(1); a new key takes
+over the smallest counter, found through a min-heap whose stale entries are refreshed lazily (counts only grow).
+Counts over-estimate by at most the count of the counter that was taken over.
+'''
+class SpaceSaving:
+
+    '''
+    Initialize the counter with a fixed capacity
+    '''
+    def __init__(self, capacity : int) -> None:
+        self._capacity = capacity
+        self._counts = dict()
+        self._min_heap = list()
+
+    '''
+    Add weight to a key
+    '''
+    def update(self, key, weight : int = 1) -> None:
+        count = self._counts.get(key, None)
+        if count is not None:
+            self._counts[key] = count + weight
+            return
+        if len(self._counts) < self._capacity:
+            self._counts[key] = weight
+            heapq.heappush(self._min_heap, (weight, key))
+            return
+        # Take over the smallest counter - refresh stale heap entries until the top is current
+        (min_count, min_key) = self._min_heap[0]
+        while self._counts[min_key] != min_count:
+            heapq.heapreplace(self._min_heap, (self._counts[min_key], min_key))
+            (min_count, min_key) = self._min_heap[0]
+        del self._counts[min_key]
+        self._counts[key] = min_count + weight
+        heapq.heapreplace(self._min_heap, (min_count + weight, key))
+
+    '''
+    Returns the counters as a dict of key to count
+    '''
+    def get_counts(self) -> dict:
+        return self._counts
+
+    '''
+    Reset all counters
+    '''
+    def clear(self) -> None:
+        self._counts = dict()
+        self._min_heap = list()
+
+'''
+Streaming top talkers by topic and by top-level prefix, counted by messages and by bytes, over sliding windows.
+Each window is a ring of fixed-length buckets holding one SpaceSaving counter per measure, so memory is fixed
+by the config regardless of topic cardinality.
+'''
+class HeavyHitters:
+
+    # Public Class Constants
+    MEASURES = ('topic_msgs', 'topic_bytes', 'prefix_msgs', 'prefix_bytes')
+
+    '''
+    Initialize the bucket ring from config. Fast, no fail.
+    '''
+    def __init__(self, app_config : config.ConfigManager) -> None:
+        heavy_hitters_config = app_config.active_config['heavy_hitters']
+        self._capacity = heavy_hitters_config['capacity']
+        self._top_k = heavy_hitters_config['top_k']
+        self._bucket_seconds = heavy_hitters_config['bucket_seconds']
+        self._window_seconds = heavy_hitters_config['window_seconds']
+        bucket_count = max(1, int(max(self._window_seconds) // self._bucket_seconds))
+        # Ring of [bucket index, {measure: SpaceSaving}] - the bucket index is the bucket start time / bucket_seconds
+        self._buckets = [[None, {measure: SpaceSaving(self._capacity) for measure in self.MEASURES}] for i in range(bucket_count)]
+        self._current_bucket = self._buckets[0]
+        self._buckets_lock = threading.Lock()
+
+    '''
+    Count one message. Called for every message received - keep it cheap.
+    '''
+    def update(self, topic : str, payload_size : int, now : datetime.datetime) -> None:
+        bucket_index = int(now.timestamp() // self._bucket_seconds)
+        prefix = topic.partition('/')[0]
+        with self._buckets_lock:
+            bucket = self._current_bucket
+            if bucket[0] != bucket_index:
+                bucket = self._rotate(bucket_index)
+            counters = bucket[1]
+            counters['topic_msgs'].update(topic)
+            counters['topic_bytes'].update(topic, payload_size)
+            counters['prefix_msgs'].update(prefix)
+            counters['prefix_bytes'].update(prefix, payload_size)
+
+    '''
+    Returns the top talkers per window and measure, e.g. {'60s': {'topic_msgs': [[topic, count], ...], ...}}.
+    Only the bucket counts are copied under the lock - update runs for every message - and merged outside it.
+    '''
+    def get_top_talkers(self, now : datetime.datetime) -> dict:
+        current_index = int(now.timestamp() // self._bucket_seconds)
+        with self._buckets_lock:
+            bucket_counts = [(bucket_index, {measure: dict(counter.get_counts()) for (measure, counter) in counters.items()})
+                             for (bucket_index, counters) in self._buckets if bucket_index is not None]
+        top_talkers = dict()
+        for window_seconds in self._window_seconds:
+            first_index = current_index - max(1, int(window_seconds // self._bucket_seconds)) + 1
+            window_buckets = [counts for (bucket_index, counts) in bucket_counts if first_index <= bucket_index <= current_index]
+            window_top_talkers = dict()
+            for measure in self.MEASURES:
+                merged_counts = dict()
+                for counts in window_buckets:
+                    for (key, count) in counts[measure].items():
+                        merged_counts[key] = merged_counts.get(key, 0) + count
+                window_top_talkers[measure] = [[key, count] for (key, count) in heapq.nlargest(self._top_k, merged_counts.items(), key=lambda item: item[1])]
+            top_talkers[f"{window_seconds}s"] = window_top_talkers
+        return top_talkers
+
+    '''
+    Move to a new bucket, clearing the ring slot it reuses. Call with the lock held.
+    '''
+    def _rotate(self, bucket_index : int) -> list:
+        bucket = self._buckets[bucket_index % len(self._buckets)]
+        if bucket[0] != bucket_index:
+            bucket[0] = bucket_index
+            for counter in bucket[1].values():
+                counter.clear()
+        self._current_bucket = bucket
+        return bucket
@@ -1,9 +1,20 @@
 import logger
 import argparse
 import config
+import datetime
+import document_encoder
+import json
+import signal
+import threading
 import mqtt_pubsub_client
 import process_monitor
+import scheduler
+import sentinel_command
 import mqtt_topic_tracker
+import sentinel_profiler
+import status_renderer
+import traffic_recorder
+import topic_watchdog
 '''
 
 '''
@@ -17,10 +28,18 @@ class MqttBrokerSentinel:
     '''
     def __init__(self,
                  app_logger : logger.Logger,
-                 app_config : config.ConfigManager) -> None:
+                 app_config : config.ConfigManager,
+                 clock = None) -> None:
         self._app_logger = app_logger
         self._app_config = app_config
+        self._clock = clock if clock is not None else datetime.datetime.now
         self._message_counter = 0
+        self._profiler = None
+        self._process_monitor = None
+        self._scheduler = None
+        self._traffic_recorder = None
+        self._topic_list_changed = False
+        self._stop_event = threading.Event()
 
     '''
     Start the Sentinel thread. Non-blocking.
@@ -30,106 +49,253 @@ class MqttBrokerSentinel:
         # Initialize Sentinel - create connections, etc.
         self._app_logger.write("sentinel", "Starting...", logger.MessageLevel.INFO)
 
-        # Start process monitor thread
-        self._process_monitor = process_monitor.ProcessMonitor(self._app_config, 
-                                                               self._app_logger,
-                                                               self._process_monitor_tick_callback)
-        self._process_monitor.start()
+        # Topic Tracker, Watchdog, Status View, Profiler - call before client is created
+        self._start_components()
+        self._topic_watchdog.start()
 
-        # Topic Tracker - call before client is created
-        self._topic_tracker = mqtt_topic_tracker.MqttTopicTracker(self._app_config, 
-                                                                  self._app_logger)
+        # Traffic Recorder - record the incoming stream for replay (config)
+        if self._app_config.active_config['recorder']['enabled']:
+            self._traffic_recorder = traffic_recorder.TrafficRecorder(self._app_config, self._app_logger)
+            self._traffic_recorder.start()
 
         # Mqtt Client
         self._start_mqtt_client()
 
+        # Scheduler - process checks, status, publishing and connection checks on their own intervals
+        self._process_monitor = process_monitor.ProcessMonitor(self._app_config, self._app_logger)
+        self._scheduler = scheduler.Scheduler(self._app_logger,
+                                              self._app_config.active_config['scheduler']['late_tolerance_seconds'])
+        self._add_scheduled_jobs()
+        self._scheduler.start()
+
         self._app_logger.write("sentinel", "Started.", logger.MessageLevel.INFO)
         return start_ok
+
+    '''
+    Block until the Sentinel is stopped. Wakes periodically so signal handlers run on every platform.
+    '''
+    def wait(self) -> None:
+        while not self._stop_event.wait(1.0):
+            pass
+
+    '''
+    Start the Sentinel for replay - no process monitor, recorder or broker connection. Messages and scheduled
+    jobs are driven by the caller through replay_message and replay_scheduled_jobs; mqtt_client stands in for
+    the subscriber and scheduler_clock returns the virtual time in seconds.
+    '''
+    def start_replay(self, mqtt_client, scheduler_clock) -> None:
+        self._app_logger.write("sentinel", "Starting replay...", logger.MessageLevel.INFO)
+        self._start_components()
+        self._mqtt_client = mqtt_client
+        self._scheduler = scheduler.Scheduler(self._app_logger,
+                                              self._app_config.active_config['scheduler']['late_tolerance_seconds'],
+                                              scheduler_clock)
+        self._add_scheduled_jobs()
+        self._app_logger.write("sentinel", "Replay started.", logger.MessageLevel.INFO)
+
+    '''
+    Feed a replayed message through the same path as a received message
+    '''
+    def replay_message(self, topic, message) -> None:
+        self._new_mqtt_message_callback(topic, message)
+
+    '''
+    Run the scheduled jobs due at the current (virtual) time. Returns the next due time in scheduler seconds.
+    '''
+    def replay_scheduled_jobs(self) -> float:
+        return self._scheduler.run_pending()
+
+    '''
+    Returns the earliest pending watchdog deadline or None
+    '''
+    def replay_next_deadline(self) -> datetime.datetime:
+        return self._topic_watchdog.get_next_deadline()
+
+    '''
+    Raise the watchdog transitions due at the current (virtual) time
+    '''
+    def replay_deadlines(self) -> None:
+        self._topic_watchdog.check_deadlines()
                                
     '''
     Stop the Sentinel thread. Blocking.
     '''
     def stop(self):
+        if self._stop_event.is_set():
+            return
         # Stop the sentinel - close connections, etc.
         self._app_logger.write("mqtt-broker-sentinel", "Stopping...", logger.MessageLevel.INFO)
-        self._process_monitor.stop()
+        if self._scheduler is not None:
+            self._scheduler.stop()
+            if self._scheduler.is_alive() and self._scheduler is not threading.current_thread():
+                self._scheduler.join()
+        self._topic_watchdog.stop()
+        if self._traffic_recorder is not None:
+            self._traffic_recorder.stop()
         self._mqtt_client.stop()
+        self._stop_event.set()
         self._app_logger.write("mqtt-broker-sentinel", "Stopped.", logger.MessageLevel.INFO)
     
     '''
     Callback for every new message received
     '''
     def _new_mqtt_message_callback(self, topic, message):
-        # Filter out broker system messages generated by this sentinel
-        base_topic = self._app_config.active_config['publish']['base_topic'] = 'sc_mqtt_broker/'
-        publish_topics = [base_topic + self._app_config.active_config['publish']['process_stats'],
-                          base_topic + self._app_config.active_config['publish']['topic_list'],
-                          base_topic + self._app_config.active_config['publish']['watchdog_topics']]
+        # Commands addressed to this sentinel
+        base_topic = self._app_config.active_config['publish']['base_topic']
+        if topic == base_topic + self._app_config.active_config['publish']['command']:
+            self._handle_command(message)
+            return
 
-        if topic in publish_topics:
+        # Filter out broker system messages generated by this sentinel
+        if topic.startswith(base_topic):
             return
 
+        # Record the stream for replay
+        if self._traffic_recorder is not None:
+            self._traffic_recorder.record(topic, message)
+
         # Update the topic tracker
         is_new_topic = self._topic_tracker.new_topic_data_received(topic, message)
         self._app_logger.write_single_line_no_header('.')
         self._message_counter += 1
         
-        # Update the topic list topic
+        # Update the topic list topic - published by the scheduler, not per message
         if is_new_topic:
+            self._topic_list_changed = True
+
+    '''
+    Publish the topic list if a new topic was received since the last publish
+    '''
+    def _publish_topic_list_if_changed(self):
+        if self._topic_list_changed:
             self._publish_topic_list()
+
     '''
     Publish the topic list to the mqtt broker
     '''
     def _publish_topic_list(self):
+        self._topic_list_changed = False
         publish_topic = self._app_config.active_config['publish']['base_topic'] + self._app_config.active_config['publish']['topic_list']
-        topics_list = self._topic_tracker.get_json_topic_list()
-        self._mqtt_client.mqtt_publish(publish_topic, topics_list)
+        self._publish_topic_entries(publish_topic, self._topic_tracker.iter_topic_entries())
     
     '''
     Publish traffic stats back to the broker
     '''
     def _publish_broker_stats(self):
         publish_topic = self._app_config.active_config['publish']['base_topic'] + self._app_config.active_config['publish']['process_stats']
-        topic_stats = self._topic_tracker.get_json_topic_stats()
-        self._mqtt_client.mqtt_publish(publish_topic, topic_stats)
+        topic_stats = self._topic_tracker.get_topic_stats()
+        topic_stats['scheduler'] = self._scheduler.get_job_stats()
+        self._mqtt_client.mqtt_publish(publish_topic, self._document_encoder.encode_document(topic_stats))
 
     '''
-    Publish topics that are in violation of the watchdog
+    Publish topics that are in violation of the watchdog - the watchdog LATE set, so the snapshot matches the events
     '''
     def _publish_topic_violations(self):
         publish_topic = self._app_config.active_config['publish']['base_topic'] + self._app_config.active_config['publish']['watchdog_topics']
-        violation_list = self._topic_tracker.get_json_topics_in_time_violation()
-        self._mqtt_client.mqtt_publish(publish_topic, violation_list)
+        self._publish_topic_entries(publish_topic, self._topic_tracker.iter_topic_entries(self._topic_watchdog.get_late_topics()))
+
+    '''
+    Publish a topic document in the configured encoding. When paged, pages go to <topic>/1..N followed by
+    a header on <topic>/pages with the page and entry counts. The header is always JSON so a reader can learn
+    the page encoding from it.
+    '''
+    def _publish_topic_entries(self, publish_topic : str, entries):
+        if not self._document_encoder.is_paged():
+            for (document, entry_count) in self._document_encoder.encode_entries(entries):
+                self._mqtt_client.mqtt_publish(publish_topic, document)
+            return
+        page_count = 0
+        entry_total = 0
+        for (document, entry_count) in self._document_encoder.encode_entries(entries):
+            page_count += 1
+            entry_total += entry_count
+            self._mqtt_client.mqtt_publish(f"{publish_topic}/{page_count}", document)
+        header = {'pages': page_count, 'entries': entry_total, 'encoding': self._document_encoder.get_encoding()}
+        self._mqtt_client.mqtt_publish(f"{publish_topic}/pages", json.dumps(header))
+
+    '''
+    Publish a single watchdog state transition as soon as it happens
+    '''
+    def _publish_watchdog_event(self, transition : dict):
+        level = logger.MessageLevel.WARN if transition['state'] == topic_watchdog.WatchdogState.LATE.name else logger.MessageLevel.INFO
+        self._app_logger.write("sentinel", f"Watchdog {transition['previous_state']} -> {transition['state']}: {transition['topic']}", level)
+        publish_topic = self._app_config.active_config['publish']['base_topic'] + self._app_config.active_config['publish']['watchdog_events']
+        self._mqtt_client.mqtt_publish(publish_topic, self._document_encoder.encode_document(transition))
+
+    '''
+    Publish the summary of a completed profiler capture
+    '''
+    def _publish_profile_summary(self, summary : dict):
+        publish_topic = self._app_config.active_config['publish']['base_topic'] + self._app_config.active_config['publish']['profile_summary']
+        self._mqtt_client.mqtt_publish(publish_topic, self._document_encoder.encode_document(summary))
+
     '''
-    Callback from process monitor that checks every minute (default)
+    Handle a command published to the command topic. Runs on the mqtt client thread, so bad payloads and
+    failed commands are logged and never raised.
     '''
-    def _process_monitor_tick_callback(self, process_exists : bool):
+    def _handle_command(self, payload):
+        try:
+            command = sentinel_command.SentinelCommand.parse(payload)
+        except ValueError as ex:
+            self._app_logger.write("sentinel", f"Invalid command: {ex}", logger.MessageLevel.WARN)
+            return
+        self._app_logger.write("sentinel", f"Command received: {command.name}", logger.MessageLevel.INFO)
+        try:
+            if command.name == 'status_dump':
+                self._status_renderer.request_full_dump()
+            elif command.name == 'profile':
+                if self._profiler is None:
+                    self._app_logger.write("sentinel", "Profiler is disabled in config.", logger.MessageLevel.WARN)
+                else:
+                    self._profiler.request_capture(command.seconds)
+        except Exception as ex:
+            self._app_logger.write("sentinel", f"Command '{command.name}' failed: {ex!r}", logger.MessageLevel.ERROR)
+
+    '''
+    Register the periodic jobs, each on its own interval (config)
+    '''
+    def _add_scheduled_jobs(self):
+        scheduler_config = self._app_config.active_config['scheduler']
 
-        # Once per second, print out the topic list
-        topic_list = self._topic_tracker.get_copy_topic_list_with_deltas()
-        topic_count = len(topic_list)
-        self._app_logger.write("sentinel", f"Topics: {topic_count}", logger.MessageLevel.INFO)
-        for (topic, (last_time, delta, last_payload)) in topic_list.items():
-            self._app_logger.write("sentinel", f'{topic:<70} {str(last_time):<30} {delta}', logger.MessageLevel.INFO) 
+        # Broker process check - live only
+        if self._process_monitor is not None:
+            self._add_scheduled_job('process_check',
+                                     self._app_config.active_config['mqtt_broker']['process']['service_wd_period_seconds'],
+                                     self._process_monitor.check_process)
 
-        # Print the topics in violation of the watchdog
-        self._app_logger.write("sentinel", "<------------ Watchdog Violations ------------>", logger.MessageLevel.INFO)  
-        violation_count = len(self._topic_tracker.get_topics_in_time_violation().items()) 
-        self._app_logger.write("sentinel", f"Violations: {violation_count} of {topic_count}", logger.MessageLevel.INFO)
-        for (topic, delta) in self._topic_tracker.get_topics_in_time_violation().items():
-            self._app_logger.write("sentinel", f"Topic in violation: {topic} - {delta}", logger.MessageLevel.WARN) 
+        # Drop topics that have gone dormant (config)
+        self._add_scheduled_job('topic_eviction', scheduler_config['topic_eviction_seconds'], self._topic_tracker.evict_dormant_topics)
+
+        # Console status view
+        self._add_scheduled_job('status_view', scheduler_config['status_view_seconds'], self._status_renderer.render)
 
         # Publish mqtt broker stats
-        self._publish_broker_stats()
+        self._add_scheduled_job('stats', scheduler_config['stats_seconds'], self._publish_broker_stats)
+
+        # Publish the list - refresh on a regular basis, and sooner when new topics arrive
+        self._add_scheduled_job('topic_list', scheduler_config['topic_list_seconds'], self._publish_topic_list)
+        self._add_scheduled_job('topic_list_changed', scheduler_config['topic_list_changed_seconds'], self._publish_topic_list_if_changed)
 
-        # Publish the list - refresh on a regular basis
-        self._publish_topic_list()
+        # Publish the full violation list for reconciliation - transitions are published as they happen
+        self._add_scheduled_job('violations',
+                                 self._app_config.active_config['watchdog_events']['reconciliation_period_seconds'],
+                                 self._publish_topic_violations)
 
-        # Publish the violations
-        self._publish_topic_violations()
+        # Push recorded traffic to disk
+        if self._traffic_recorder is not None:
+            self._add_scheduled_job('recorder_flush', scheduler_config['recorder_flush_seconds'], self._traffic_recorder.flush)
 
         # Check on the mqtt client connection - the client connection is shakey and needs to be kicked every so often
-        self._validate_mqtt_broker_connection()
+        self._add_scheduled_job('connection_check', scheduler_config['connection_check_seconds'], self._validate_mqtt_broker_connection)
+
+    '''
+    Add a periodic job; an interval of 0 (config) disables the job
+    '''
+    def _add_scheduled_job(self, name : str, interval_seconds : float, callback):
+        if interval_seconds == 0:
+            self._app_logger.write("sentinel", f"Job '{name}' disabled in config.", logger.MessageLevel.INFO)
+            return
+        self._scheduler.add_job(name, interval_seconds, callback)
 
     '''
     Start the mqtt client
@@ -146,6 +312,59 @@ class MqttBrokerSentinel:
 
 
     
+    '''
+    Create the document encoder, topic watchdog, topic tracker, status view and profiler
+    '''
+    def _start_components(self):
+        # Published document encoding (config)
+        self._document_encoder = document_encoder.DocumentEncoder(self._app_config)
+
+        # Topic Watchdog - edge-triggered violation events
+        self._topic_watchdog = topic_watchdog.TopicWatchdog(self._app_config,
+                                                            self._app_logger,
+                                                            self._publish_watchdog_event,
+                                                            self._clock)
+
+        # Topic Tracker
+        self._topic_tracker = mqtt_topic_tracker.MqttTopicTracker(self._app_config,
+                                                                  self._app_logger,
+                                                                  self._clock,
+                                                                  self._topic_watchdog.topic_received,
+                                                                  self._topic_watchdog.topic_removed)
+
+        # Console Status View
+        self._status_renderer = status_renderer.StatusRenderer(self._app_config,
+                                                               self._app_logger,
+                                                               self._topic_tracker,
+                                                               self._topic_watchdog,
+                                                               self._clock)
+        self._bind_signal(self._app_config.active_config['status_view']['full_dump_signal'],
+                          self._status_renderer.request_full_dump)
+
+        # On-demand Profiler - idle until triggered by signal or command topic
+        if self._app_config.active_config['profiler']['enabled']:
+            self._start_profiler()
+
+    '''
+    Create the profiler and bind the trigger signal (main thread and supporting OS only)
+    '''
+    def _start_profiler(self):
+        self._profiler = sentinel_profiler.SentinelProfiler(self._app_config,
+                                                            self._app_logger,
+                                                            self._publish_profile_summary)
+        self._bind_signal(self._app_config.active_config['profiler']['signal'],
+                          self._profiler.request_capture)
+
+    '''
+    Bind a handler to a signal by name (main thread and supporting OS only); the command topic is the fallback
+    '''
+    def _bind_signal(self, signal_name : str, handler):
+        if hasattr(signal, signal_name) and threading.current_thread() is threading.main_thread():
+            signal.signal(getattr(signal, signal_name), lambda signum, frame: handler())
+            self._app_logger.write("sentinel", f"{signal_name} bound to {handler.__name__}.", logger.MessageLevel.INFO)
+        else:
+            self._app_logger.write("sentinel", f"Signal {signal_name} unavailable; command topic only.", logger.MessageLevel.WARN)
+
     def _validate_mqtt_broker_connection(self):
         if self._mqtt_client is None or not self._mqtt_client.is_connected():
             self._app_logger.write("sentinel", "Restarting MQTT Client...", logger.MessageLevel.WARN)
@@ -153,9 +372,9 @@ class MqttBrokerSentinel:
             if self._mqtt_client.is_connected():
                 self._app_logger.write("sentinel", "MQTT Client restarted.", logger.MessageLevel.WARN)
             else:
-                process_check_seconds = self._app_config.active_config['mqtt_broker']['process']["service_wd_period_seconds"]
+                connection_check_seconds = self._app_config.active_config['scheduler']['connection_check_seconds']
                 self._app_logger.write("sentinel", 
-                                       f"Unable to restart MQTT client. Will attempt again in {process_check_seconds} seconds.", 
+                                       f"Unable to restart MQTT client. Will attempt again in {connection_check_seconds} seconds.", 
                                        logger.MessageLevel.WARN)
 
           
@@ -190,4 +409,10 @@ if __name__ == '__main__':
     sentinel = MqttBrokerSentinel(app_logger, app_config)
     sentinel.start()
 
-    # TODO: Capture key input or SIGINT to stop the sentinel
\ No newline at end of file
+    # Run until SIGINT or SIGTERM - SIGTERM is raised as KeyboardInterrupt like SIGINT
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        sentinel.wait()
+    except KeyboardInterrupt:
+        pass
+    sentinel.stop()
\ No newline at end of file
@@ -1,8 +1,13 @@
 import datetime
 import copy
+import collections
+import re
+import sys
+import threading
 import config
 import logger
 import json
+import heavy_hitters
 
 '''
 Keeps a list of topics and notifies when a new topic is received. It also monitors the last time a topic was received.
@@ -12,46 +17,148 @@ class MqttTopicTracker:
     # Private Members
     _log_key = 'topic_tracker'
 
+    # Approximate bytes per entry on top of the topic and payload objects (odict node, tuple, datetime)
+    _ENTRY_OVERHEAD_BYTES = 200
+
     # Topic Stats
     _message_counter = 0
     _last_counter_reset = None
+    _evicted_counter = 0
+    _topic_memory_bytes = 0
 
     '''
     Initialize the tracker. Fast, no fail.
     '''
     def __init__(self, 
                  app_config : config.ConfigManager, 
-                 app_logger : logger.Logger) -> None:
+                 app_logger : logger.Logger,
+                 clock = None,
+                 topic_received_callback = None,
+                 topic_removed_callback = None) -> None:
 
         # Locals
         self._logger = app_logger
         self._app_config = app_config
-        self._topics = dict()
+        self._clock = clock if clock is not None else datetime.datetime.now
+        self._topic_received_callback = topic_received_callback
+        self._topic_removed_callback = topic_removed_callback
+        # Least recently updated topic first
+        self._topics = collections.OrderedDict()
+        self._topics_lock = threading.Lock()
+
+        # Changes since the last drain - sized by traffic in the period, not by topic count
+        self._changed_topic_counts = dict()
+        self._changed_new_topics = list()
+        self._changed_evicted_topics = list()
+
+        # Limits - 0 disables the limit
+        tracker_config = self._app_config.active_config['topic_tracker']
+        self._max_topics = tracker_config['max_topics']
+        self._max_memory_bytes = tracker_config['max_memory_bytes']
+        self._dormant_eviction_seconds = tracker_config['dormant_eviction_seconds']
+        self._aggregate_filters = [(topic_filter, self._topic_filter_to_regex(topic_filter)) for topic_filter in tracker_config['aggregate_filters']]
+        # Topics with an explicit watchdog rule are never evicted
+        self._protected_topics = set(self._get_watchdog_list().keys())
 
-        self._last_counter_reset = datetime.datetime.now()
+        # Top talkers by raw topic and prefix - fixed memory (config)
+        self._heavy_hitters = None
+        if self._app_config.active_config['heavy_hitters']['enabled']:
+            self._heavy_hitters = heavy_hitters.HeavyHitters(self._app_config)
+
+        self._last_counter_reset = self._clock()
 
     '''
     Called when a new topic is received by the MQTT Client
     '''
     def new_topic_data_received(self, topic, payload) -> bool:
         self._message_counter += 1
-        is_new_topic = (self._topics.get(topic, None) == None)
-        self._topics[topic] = (datetime.datetime.now(), payload)
+        now = self._clock()
+        if self._heavy_hitters is not None:
+            self._heavy_hitters.update(topic, len(payload), now)
+        topic = self._aggregate_topic(topic)
+        with self._topics_lock:
+            previous = self._topics.pop(topic, None)
+            is_new_topic = (previous == None)
+            if not is_new_topic:
+                self._topic_memory_bytes -= self._entry_size(topic, previous)
+            entry = (now, payload)
+            self._topics[topic] = entry
+            self._topic_memory_bytes += self._entry_size(topic, entry)
+            self._changed_topic_counts[topic] = self._changed_topic_counts.get(topic, 0) + 1
+            if is_new_topic:
+                self._changed_new_topics.append(topic)
+            # New topics and growing payloads can both push the tracker over budget
+            self._evict_over_budget(topic)
+        # Outside the lock - the callback may log and publish
+        if self._topic_received_callback is not None:
+            self._topic_received_callback(topic)
         if is_new_topic:
             self._logger.write(self._log_key, f"New topic received: {topic}", logger.MessageLevel.INFO)
         return is_new_topic
 
+    '''
+    Evict topics that have not been received within the dormant time (config). Returns the evicted count.
+    '''
+    def evict_dormant_topics(self) -> int:
+        if self._dormant_eviction_seconds <= 0:
+            return 0
+        cutoff = self._clock() - datetime.timedelta(seconds=self._dormant_eviction_seconds)
+        dormant_topics = list()
+        with self._topics_lock:
+            # Oldest first - stop at the first topic received after the cutoff
+            for (topic, (last_time, last_payload)) in self._topics.items():
+                if last_time >= cutoff:
+                    break
+                if topic not in self._protected_topics:
+                    dormant_topics.append(topic)
+            for topic in dormant_topics:
+                self._evict_topic(topic)
+        if len(dormant_topics) > 0:
+            self._logger.write(self._log_key, f"Evicted {len(dormant_topics)} dormant topics.", logger.MessageLevel.INFO)
+        return len(dormant_topics)
+
+    '''
+    Returns the changes since the last call as (message count per updated topic, new topics, evicted topics)
+    '''
+    def drain_changes(self) -> tuple:
+        with self._topics_lock:
+            changes = (self._changed_topic_counts, self._changed_new_topics, self._changed_evicted_topics)
+            self._changed_topic_counts = dict()
+            self._changed_new_topics = list()
+            self._changed_evicted_topics = list()
+        return changes
+
+    '''
+    Returns up to count of the least recently received topics as (topic, last time, delta) - oldest first
+    '''
+    def get_stalest_topics(self, count : int) -> list:
+        now = self._clock()
+        stalest_topics = list()
+        with self._topics_lock:
+            for (topic, (last_time, last_payload)) in self._topics.items():
+                if len(stalest_topics) >= count:
+                    break
+                stalest_topics.append((topic, last_time, now - last_time))
+        return stalest_topics
+
+    '''
+    Returns the number of topics being tracked
+    '''
+    def get_topic_count(self) -> int:
+        return len(self._topics)
+
     '''
     Returns a copy of the topics and last reported datetime
     '''
     def get_copy_topic_list(self):
-        return copy.deepcopy(self._topics)
+        with self._topics_lock:
+            return copy.deepcopy(self._topics)
     
     '''
     Returns a copy of the topics and last reported datetime with the time deltas
     '''
     def get_copy_topic_list_with_deltas(self):
-        now = datetime.datetime.now()
+        now = self._clock()
         topic_list_with_deltas = dict()
         for (topic, (last_time, last_payload)) in self.get_copy_topic_list().items():
             delta = now - last_time
@@ -68,29 +175,18 @@ class MqttTopicTracker:
         return json.dumps(json_topic_list)
 
     '''
-    Returns a list of topics that have not been received in the specified time (config)
+    Iterate (topic, last time iso, delta seconds, last payload) for every topic, or for the given topics that are
+    still tracked (sorted), for streamed encoding
     '''
-    def get_topics_in_time_violation(self) -> list:
-        topic_list = dict()
-        watchdog_list = self._get_watchdog_list()
-        all_topics_max_time_seconds = self._app_config.active_config['topic_watchdog']['all']['max_time_seconds']
-        for (topic, (last_time, delta, last_payload)) in self.get_copy_topic_list_with_deltas().items():
-            if (delta.total_seconds() > all_topics_max_time_seconds):
-                topic_list[topic] = (last_time, delta, last_payload)
+    def iter_topic_entries(self, topics = None):
+        now = self._clock()
+        with self._topics_lock:
+            if topics is None:
+                topic_snapshot = list(self._topics.items())
             else:
-                for (wdt_topic, watchdog_time_seconds) in watchdog_list.items():
-                    if (topic == wdt_topic and delta.total_seconds() > watchdog_time_seconds):
-                        topic_list[topic] = (last_time, delta, last_payload)
-        return topic_list
-    
-    '''
-    Get the json version of the topics in time violation
-    '''
-    def get_json_topics_in_time_violation(self) -> str:
-        violation_list = dict()
-        for (topic, (last_time, delta, last_payload)) in self.get_topics_in_time_violation().items():
-            violation_list[topic] = (last_time.isoformat(), delta.total_seconds(), str(last_payload))
-        return json.dumps(violation_list)
+                topic_snapshot = [(topic, self._topics[topic]) for topic in sorted(topics) if topic in self._topics]
+        for (topic, (last_time, last_payload)) in topic_snapshot:
+            yield (topic, last_time.isoformat(), (now - last_time).total_seconds(), last_payload)
 
     '''
     Gets a dict of the watchdog list and excludes 'all'
@@ -108,17 +204,79 @@ class MqttTopicTracker:
     '''
     def get_topic_stats(self) -> dict:
         stats = dict()
-        now = datetime.datetime.now()
+        now = self._clock()
         delta = now - self._last_counter_reset
         count = self._message_counter
         self._message_counter = 0
         self._last_counter_reset = now
-        stats['msgs_per_sec'] = count / delta.total_seconds()
+        stats['msgs_per_sec'] = count / max(delta.total_seconds(), 1e-6)
         stats['topic_count'] = len(self._topics)
+        stats['topic_memory_bytes'] = self._topic_memory_bytes
+        stats['evicted_count'] = self._evicted_counter
+        if self._heavy_hitters is not None:
+            stats['top_talkers'] = self._heavy_hitters.get_top_talkers(now)
         return stats
     
     '''
-    Get the JSON version of the topic stats
+    Evict least recently received, unprotected topics until the topic count and memory are within budget.
+    The topic just received is never evicted; if its entry alone exceeds the memory budget, no other topics
+    are evicted to make room for it. Call with the topics lock held.
+    '''
+    def _evict_over_budget(self, keep_topic) -> None:
+        max_memory_bytes = self._max_memory_bytes
+        if max_memory_bytes > 0 and self._entry_size(keep_topic, self._topics[keep_topic]) > max_memory_bytes:
+            max_memory_bytes = 0
+        while self._is_over_budget(max_memory_bytes):
+            evict_topic = next((topic for topic in self._topics if topic not in self._protected_topics and topic != keep_topic), None)
+            if evict_topic is None:
+                return
+            self._evict_topic(evict_topic)
+
+    '''
+    Returns true/false if the topic count or memory exceeds the limits (0 disables a limit)
+    '''
+    def _is_over_budget(self, max_memory_bytes : int) -> bool:
+        if self._max_topics > 0 and len(self._topics) > self._max_topics:
+            return True
+        return max_memory_bytes > 0 and self._topic_memory_bytes > max_memory_bytes
+
+    '''
+    Remove a topic and account for it in the stats. Call with the topics lock held.
+    '''
+    def _evict_topic(self, topic) -> None:
+        entry = self._topics.pop(topic)
+        self._topic_memory_bytes -= self._entry_size(topic, entry)
+        self._evicted_counter += 1
+        self._changed_topic_counts.pop(topic, None)
+        self._changed_evicted_topics.append(topic)
+        if self._topic_removed_callback is not None:
+            self._topic_removed_callback(topic)
+
+    '''
+    Approximate memory used by a topic entry
+    '''
+    def _entry_size(self, topic, entry) -> int:
+        return sys.getsizeof(topic) + sys.getsizeof(entry[1]) + self._ENTRY_OVERHEAD_BYTES
+
+    '''
+    Map a topic to the first aggregate filter it matches (config) so high-cardinality topics share one entry
+    '''
+    def _aggregate_topic(self, topic) -> str:
+        for (topic_filter, topic_regex) in self._aggregate_filters:
+            if topic_regex.fullmatch(topic):
+                return topic_filter
+        return topic
+
+    '''
+    Compile an MQTT topic filter with + and # wildcards into a regex. A trailing # also matches the parent level
+    e.g. 'a/#' matches 'a'.
     '''
-    def get_json_topic_stats(self) -> str:
-        return json.dumps(self.get_topic_stats())
\ No newline at end of file
+    def _topic_filter_to_regex(self, topic_filter : str) -> re.Pattern:
+        levels = topic_filter.split('/')
+        multi_level = levels[-1] == '#'
+        if multi_level:
+            levels.pop()
+        pattern = '/'.join('[^/]*' if level == '+' else re.escape(level) for level in levels)
+        if multi_level:
+            pattern = pattern + '(/.*)?' if len(levels) > 0 else '.*'
+        return re.compile(pattern)
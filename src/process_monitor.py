@@ -1,56 +1,37 @@
-import threading
 import subprocess
-import time
 import config
 import logger
 import platform
 import subprocess
 
-class ProcessMonitor(threading.Thread):
+class ProcessMonitor:
     '''
     Initilize the ProcessMonitor with a process name
     '''
     def __init__(self, 
                  app_config : config.ConfigManager, 
-                 app_logger : logger.Logger, 
-                 process_monitor_tick_callback) -> None:
+                 app_logger : logger.Logger) -> None:
 
         # Locals
         self._logger = app_logger
         self._app_config = app_config
-        self._process_monitor_tick_callback = process_monitor_tick_callback
 
-        # Create thread
-        threading.Thread.__init__(self)
-        self.stop_event = threading.Event()
     '''
-    Run the process monitor
-    '''
-    def run(self):
-        while not self.stop_event.is_set():
-            # Locals
-            proc_name = self._app_config.active_config['mqtt_broker']['process']["name"]
-            sleep_time_secs = self._app_config.active_config['mqtt_broker']['process']["service_wd_period_seconds"]
-            process_exists = False
-            if platform.system() == 'Windows':
-                process_exists = self._windows_process_exists(proc_name)
-                self._logger.write("proc_mon", f'Service {proc_name} running = {process_exists}. Sleeping for {sleep_time_secs} seconds.')
-            elif platform.system() == 'Linux':
-                result = subprocess.run(['systemctl', 'is-active', proc_name], stdout=subprocess.PIPE)
-                self._logger.write("proc_mon", f'Service {proc_name} is {result.stdout.decode().strip()}. Sleeping for {sleep_time_secs} seconds.')
-            else:
-                self._logger.write("proc_mon", "Unknown OS - not checking any process. Sleeping for 60 seconds.")
-
-            # Call the callback
-            if self._process_monitor_tick_callback is not None:
-                self._process_monitor_tick_callback(process_exists)
-            time.sleep(sleep_time_secs)
-
-    '''
-    Stop the process monitor
-    '''
-    def stop(self):
-        self.stop_event.set()
+    Check the broker process once - run periodically by the scheduler
+    '''
+    def check_process(self) -> bool:
+        proc_name = self._app_config.active_config['mqtt_broker']['process']["name"]
+        process_exists = False
+        if platform.system() == 'Windows':
+            process_exists = self._windows_process_exists(proc_name)
+            self._logger.write("proc_mon", f'Service {proc_name} running = {process_exists}.')
+        elif platform.system() == 'Linux':
+            result = subprocess.run(['systemctl', 'is-active', proc_name], stdout=subprocess.PIPE)
+            process_exists = (result.stdout.decode().strip() == 'active')
+            self._logger.write("proc_mon", f'Service {proc_name} is {result.stdout.decode().strip()}.')
+        else:
+            self._logger.write("proc_mon", "Unknown OS - not checking any process.")
+        return process_exists
 
     '''
     Windows function to check if a process exists
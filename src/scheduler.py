@@ -0,0 +1,117 @@
+import threading
+import time
+import logger
+
+'''
+Runs jobs on their own intervals from one thread. Due times advance by a fixed interval from the start time so
+run time does not accumulate as drift. A job that starts late is counted as late; whole intervals missed while
+the thread was busy are skipped (not run back to back) and counted. Stop wakes the thread immediately.
+'''
+class Scheduler(threading.Thread):
+
+    # Private Class Constants
+    _log_key = 'scheduler'
+
+    # Job fields
+    _NAME = 0
+    _INTERVAL = 1
+    _CALLBACK = 2
+    _NEXT_DUE = 3
+    _STATS = 4
+
+    '''
+    Initialize the scheduler. clock returns seconds as a float (default: time.monotonic).
+    A job is late when it starts more than late_tolerance_seconds after its due time.
+    '''
+    def __init__(self,
+                 app_logger : logger.Logger,
+                 late_tolerance_seconds : float,
+                 clock = None) -> None:
+
+        # Locals
+        self._logger = app_logger
+        self._late_tolerance_seconds = late_tolerance_seconds
+        self._clock = clock if clock is not None else time.monotonic
+        self._jobs = list()
+        self._jobs_lock = threading.Lock()
+
+        # Create thread
+        threading.Thread.__init__(self, name="scheduler", daemon=True)
+        self.stop_event = threading.Event()
+
+    '''
+    Add a job that runs every interval_seconds, first run as soon as the scheduler runs. Raises ValueError for an
+    interval that is not positive.
+    '''
+    def add_job(self, name : str, interval_seconds : float, callback) -> None:
+        if not interval_seconds > 0:
+            raise ValueError(f"Job '{name}' interval must be positive, got {interval_seconds}")
+        stats = {'runs': 0, 'late': 0, 'skipped': 0, 'errors': 0, 'last_duration_seconds': 0.0, 'max_duration_seconds': 0.0}
+        with self._jobs_lock:
+            self._jobs.append([name, interval_seconds, callback, None, stats])
+        self._logger.write(self._log_key, f"Job '{name}' every {interval_seconds} seconds.", logger.MessageLevel.INFO)
+
+    '''
+    Run the scheduler thread
+    '''
+    def run(self):
+        while not self.stop_event.is_set():
+            next_due = self.run_pending()
+            self.stop_event.wait(max(next_due - self._clock(), 0))
+
+    '''
+    Stop the scheduler thread - returns without waiting for the current interval
+    '''
+    def stop(self):
+        self.stop_event.set()
+
+    '''
+    Run every job that is due now. Returns the next due time on the scheduler clock.
+    '''
+    def run_pending(self) -> float:
+        with self._jobs_lock:
+            jobs = list(self._jobs)
+        for job in jobs:
+            if self.stop_event.is_set():
+                break
+            now = self._clock()
+            if job[self._NEXT_DUE] is None:
+                job[self._NEXT_DUE] = now
+            if now < job[self._NEXT_DUE]:
+                continue
+            self._run_job(job, now)
+        return min((job[self._NEXT_DUE] for job in jobs), default=self._clock() + 1.0)
+
+    '''
+    Returns the run/late/skipped/error counts and durations per job
+    '''
+    def get_job_stats(self) -> dict:
+        with self._jobs_lock:
+            return {job[self._NAME]: dict(job[self._STATS]) for job in self._jobs}
+
+    '''
+    Run one job and move its due time forward by whole intervals
+    '''
+    def _run_job(self, job : list, now : float) -> None:
+        stats = job[self._STATS]
+        interval = job[self._INTERVAL]
+        lateness = now - job[self._NEXT_DUE]
+        if lateness > self._late_tolerance_seconds:
+            stats['late'] += 1
+        if lateness >= interval:
+            skipped = int(lateness // interval)
+            stats['skipped'] += skipped
+            job[self._NEXT_DUE] += skipped * interval
+            self._logger.write(self._log_key, f"Job '{job[self._NAME]}' skipped {skipped} runs ({lateness:.3f} seconds late).", logger.MessageLevel.WARN)
+
+        started = self._clock()
+        try:
+            job[self._CALLBACK]()
+        except Exception as ex:
+            stats['errors'] += 1
+            self._logger.write(self._log_key, f"Job '{job[self._NAME]}' failed: {ex!r}", logger.MessageLevel.ERROR)
+        duration = self._clock() - started
+        stats['runs'] += 1
+        stats['last_duration_seconds'] = duration
+        stats['max_duration_seconds'] = max(stats['max_duration_seconds'], duration)
+        job[self._NEXT_DUE] += interval
@@ -0,0 +1,48 @@
+import json
+import math
+
+'''
+Command published to the sentinel command topic. The payload is either a bare command name e.g. 'profile' or
+a JSON object e.g. {"command": "profile", "seconds": 10}.
+'''
+class SentinelCommand:
+
+    # Public Class Constants
+    COMMANDS = ('profile', 'status_dump')
+
+    '''
+    Initialize the command
+    '''
+    def __init__(self, name : str, seconds : float = None) -> None:
+        self.name = name
+        self.seconds = seconds
+
+    '''
+    Parse a command payload. Raises ValueError for a payload that is not a known, well formed command.
+    '''
+    @staticmethod
+    def parse(payload) -> 'SentinelCommand':
+        try:
+            payload_str = payload.decode('utf8').strip() if isinstance(payload, (bytes, bytearray)) else str(payload).strip()
+        except UnicodeDecodeError as ex:
+            raise ValueError(f"Command payload is not utf8: {ex}")
+        if payload_str.startswith('{'):
+            command_args = json.loads(payload_str)
+        else:
+            command_args = {'command': payload_str}
+
+        name = command_args.get('command', None)
+        if name not in SentinelCommand.COMMANDS:
+            raise ValueError(f"Unknown command: {name!r}")
+
+        seconds = command_args.get('seconds', None)
+        if seconds is not None:
+            if isinstance(seconds, bool):
+                raise ValueError(f"seconds must be a number, got {seconds!r}")
+            try:
+                seconds = float(seconds)
+            except (TypeError, ValueError):
+                raise ValueError(f"seconds must be a number, got {seconds!r}")
+            if not math.isfinite(seconds) or seconds <= 0:
+                raise ValueError(f"seconds must be a positive finite number, got {seconds}")
+        return SentinelCommand(name, seconds)
@@ -0,0 +1,173 @@
+import datetime
+import collections
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import config
+import logger
+
+'''
+On-demand profiler for the running sentinel. Nothing is hooked or traced until a capture is requested;
+a capture samples the stacks of every thread (tracker, mqtt callbacks, scheduled jobs) and diffs tracemalloc
+snapshots taken at the start and end of the capture window.
+'''
+class SentinelProfiler:
+
+    # Private Class Constants
+    _log_key = 'profiler'
+
+    '''
+    Initialize the profiler. Fast, no fail. No tracing is started here.
+    '''
+    def __init__(self,
+                 app_config : config.ConfigManager,
+                 app_logger : logger.Logger,
+                 capture_complete_callback) -> None:
+
+        # Locals
+        self._logger = app_logger
+        self._app_config = app_config
+        self._capture_complete_callback = capture_complete_callback
+        self._capture_thread = None
+        self._capture_lock = threading.Lock()
+
+    '''
+    Start a capture in the background; seconds is clamped to the configured maximum. Returns False if a capture
+    is already running.
+    '''
+    def request_capture(self, seconds : float = None) -> bool:
+        profiler_config = self._app_config.active_config['profiler']
+        if seconds is None or seconds <= 0:
+            seconds = profiler_config['default_seconds']
+        if seconds > profiler_config['max_seconds']:
+            self._logger.write(self._log_key, f"Capture of {seconds} seconds limited to {profiler_config['max_seconds']} seconds.", logger.MessageLevel.WARN)
+            seconds = profiler_config['max_seconds']
+        with self._capture_lock:
+            if self.is_capturing():
+                self._logger.write(self._log_key, "Capture already running; request ignored.", logger.MessageLevel.WARN)
+                return False
+            self._capture_thread = threading.Thread(target=self._capture_thread_run,
+                                                    args=(seconds,),
+                                                    name="sentinel-profiler",
+                                                    daemon=True)
+            self._capture_thread.start()
+        self._logger.write(self._log_key, f"Capture started for {seconds} seconds.", logger.MessageLevel.INFO)
+        return True
+
+    '''
+    Returns true/false if a capture is in progress
+    '''
+    def is_capturing(self) -> bool:
+        return self._capture_thread is not None and self._capture_thread.is_alive()
+
+    '''
+    Capture thread - sample all thread stacks for the requested time and diff the memory snapshots
+    '''
+    def _capture_thread_run(self, seconds : float) -> None:
+        profiler_config = self._app_config.active_config['profiler']
+        sample_interval_seconds = profiler_config['sample_interval_seconds']
+        top_n = profiler_config['top_n']
+
+        # Memory tracing - only stop tracemalloc if this capture started it
+        tracemalloc_started_here = not tracemalloc.is_tracing()
+        if tracemalloc_started_here:
+            tracemalloc.start(profiler_config['tracemalloc_frames'])
+        snapshot_start = tracemalloc.take_snapshot()
+
+        # Stack sampling
+        own_thread_id = threading.get_ident()
+        self_counts = collections.Counter()
+        cumulative_counts = collections.Counter()
+        thread_counts = collections.Counter()
+        sample_count = 0
+        started = datetime.datetime.now()
+        end_time = time.monotonic() + seconds
+        while time.monotonic() < end_time:
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for (thread_id, frame) in sys._current_frames().items():
+                if thread_id == own_thread_id:
+                    continue
+                thread_counts[thread_names.get(thread_id, str(thread_id))] += 1
+                self_counts[self._line_key(frame)] += 1
+                seen = set()
+                while frame is not None:
+                    key = self._frame_key(frame)
+                    if key not in seen:
+                        cumulative_counts[key] += 1
+                        seen.add(key)
+                    frame = frame.f_back
+            sample_count += 1
+            time.sleep(sample_interval_seconds)
+        duration = datetime.datetime.now() - started
+
+        # Memory diff
+        snapshot_end = tracemalloc.take_snapshot()
+        (traced_current, traced_peak) = tracemalloc.get_traced_memory()
+        if tracemalloc_started_here:
+            tracemalloc.stop()
+        trace_filters = (tracemalloc.Filter(False, tracemalloc.__file__),
+                         tracemalloc.Filter(False, "<frozen importlib._bootstrap>"))
+        allocation_diffs = snapshot_end.filter_traces(trace_filters).compare_to(snapshot_start.filter_traces(trace_filters), 'lineno')[:top_n]
+
+        # Build the summary and write the full report to disk
+        summary = dict()
+        summary['started'] = started.isoformat()
+        summary['duration_seconds'] = duration.total_seconds()
+        summary['samples'] = sample_count
+        summary['threads'] = dict(thread_counts)
+        summary['top_self'] = [(key, count) for (key, count) in self_counts.most_common(top_n)]
+        summary['top_cumulative'] = [(key, count) for (key, count) in cumulative_counts.most_common(top_n)]
+        summary['top_allocations'] = [(str(stat.traceback), stat.size_diff, stat.count_diff) for stat in allocation_diffs]
+        summary['traced_memory_bytes'] = traced_current
+        summary['traced_peak_bytes'] = traced_peak
+        summary['report_file'] = self._write_report(summary)
+        self._logger.write(self._log_key, f"Capture complete: {sample_count} samples. Report: {summary['report_file']}", logger.MessageLevel.INFO)
+
+        # Call the callback
+        if self._capture_complete_callback is not None:
+            self._capture_complete_callback(summary)
+
+    '''
+    Write a human readable report of the capture summary; returns the file path
+    '''
+    def _write_report(self, summary : dict) -> str:
+        output_folder = os.path.join(os.getcwd(), self._app_config.active_config['profiler']['output_folder'])
+        if not os.path.exists(output_folder):
+            os.makedirs(output_folder)
+        file_name = "profile_{0}.txt".format(datetime.datetime.now().strftime("%Y%m%d_%H%M%S"))
+        file_path = os.path.join(output_folder, file_name)
+        thread_samples = max(sum(summary['threads'].values()), 1)
+        with open(file_path, 'w') as file:
+            file.write(f"Started: {summary['started']}\n")
+            file.write(f"Duration: {summary['duration_seconds']:.3f} seconds\n")
+            file.write(f"Samples: {summary['samples']} ({thread_samples} thread samples)\n")
+            file.write(f"Traced memory: {summary['traced_memory_bytes']} bytes (peak {summary['traced_peak_bytes']} bytes)\n")
+            file.write("\n<------------ Thread Samples ------------>\n")
+            for (thread_name, count) in summary['threads'].items():
+                file.write(f"{thread_name:<40} {count}\n")
+            file.write("\n<------------ Top Self by Line (thread samples, % of thread samples) ------------>\n")
+            for (key, count) in summary['top_self']:
+                file.write(f"{count:>8} {100.0 * count / thread_samples:>6.1f}%  {key}\n")
+            file.write("\n<------------ Top Cumulative by Function (thread samples, % of thread samples) ------------>\n")
+            for (key, count) in summary['top_cumulative']:
+                file.write(f"{count:>8} {100.0 * count / thread_samples:>6.1f}%  {key}\n")
+            file.write("\n<------------ Top Allocations (size diff, count diff) ------------>\n")
+            for (location, size_diff, count_diff) in summary['top_allocations']:
+                file.write(f"{size_diff:>+12} B {count_diff:>+8}  {location}\n")
+        return file_path
+
+    '''
+    Build a compact key for a function: file:def line(function)
+    '''
+    def _frame_key(self, frame) -> str:
+        code = frame.f_code
+        return f"{os.path.basename(code.co_filename)}:{code.co_firstlineno}({code.co_name})"
+
+    '''
+    Build a compact key for the line a frame is executing: file:line(function)
+    '''
+    def _line_key(self, frame) -> str:
+        code = frame.f_code
+        return f"{os.path.basename(code.co_filename)}:{frame.f_lineno}({code.co_name})"
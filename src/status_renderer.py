@@ -0,0 +1,109 @@
+import datetime
+import heapq
+import threading
+import config
+import logger
+import mqtt_topic_tracker
+import topic_watchdog
+
+'''
+Console status view. Prints a compact summary and the top-N topics by rate and staleness along with what
+changed since the last render; the cost scales with the traffic in the period and N, not the topic count.
+The full per-topic dump is printed on request.
+'''
+class StatusRenderer:
+
+    # Private Class Constants
+    _log_key = 'sentinel'
+
+    '''
+    Initialize the renderer. Fast, no fail.
+    '''
+    def __init__(self,
+                 app_config : config.ConfigManager,
+                 app_logger : logger.Logger,
+                 topic_tracker : mqtt_topic_tracker.MqttTopicTracker,
+                 watchdog : topic_watchdog.TopicWatchdog,
+                 clock = None) -> None:
+
+        # Locals
+        self._logger = app_logger
+        self._app_config = app_config
+        self._clock = clock if clock is not None else datetime.datetime.now
+        self._topic_tracker = topic_tracker
+        self._topic_watchdog = watchdog
+        self._full_dump_event = threading.Event()
+        self._last_render = self._clock()
+        self._render_counter = 0
+        self._last_violations = set()
+
+    '''
+    Print the full topic list on the next render
+    '''
+    def request_full_dump(self) -> None:
+        self._full_dump_event.set()
+
+    '''
+    Render the status view. Skipped if called again within the minimum period (config); changes carry over.
+    '''
+    def render(self) -> bool:
+        status_config = self._app_config.active_config['status_view']
+        now = self._clock()
+        period = now - self._last_render
+        if period.total_seconds() < status_config['min_period_seconds']:
+            return False
+        self._last_render = now
+        self._render_counter += 1
+
+        # Full dump - on request or every N renders (config)
+        full_dump_every_n_renders = status_config['full_dump_every_n_renders']
+        if self._full_dump_event.is_set() or (full_dump_every_n_renders > 0 and self._render_counter % full_dump_every_n_renders == 0):
+            self._full_dump_event.clear()
+            self._render_full_dump()
+
+        top_n = status_config['top_n']
+        violation_topics = self._topic_watchdog.get_late_topics()
+        (topic_counts, new_topics, evicted_topics) = self._topic_tracker.drain_changes()
+        period_seconds = max(period.total_seconds(), 1e-6)
+        message_count = sum(topic_counts.values())
+
+        # Summary
+        self._logger.write(self._log_key,
+                           f"Topics: {self._topic_tracker.get_topic_count()} (+{len(new_topics)} new, -{len(evicted_topics)} evicted, {len(topic_counts)} updated) | "
+                           f"Msgs: {message_count} in {period_seconds:.1f}s ({message_count / period_seconds:.1f}/s) | "
+                           f"Violations: {len(violation_topics)}",
+                           logger.MessageLevel.INFO)
+
+        # Top N by rate
+        for (topic, count) in heapq.nlargest(top_n, topic_counts.items(), key=lambda item: item[1]):
+            self._logger.write(self._log_key, f'  rate  {topic:<70} {count / period_seconds:>10.2f}/s', logger.MessageLevel.INFO)
+
+        # Top N by staleness
+        for (topic, last_time, delta) in self._topic_tracker.get_stalest_topics(top_n):
+            self._logger.write(self._log_key, f'  stale {topic:<70} {str(last_time):<30} {delta}', logger.MessageLevel.INFO)
+
+        # Recent changes
+        self._write_topic_changes("New topics", new_topics, top_n, logger.MessageLevel.INFO)
+        self._write_topic_changes("Evicted topics", evicted_topics, top_n, logger.MessageLevel.INFO)
+        self._write_topic_changes("New violations", list(violation_topics - self._last_violations), top_n, logger.MessageLevel.WARN)
+        self._write_topic_changes("Cleared violations", list(self._last_violations - violation_topics), top_n, logger.MessageLevel.INFO)
+        self._last_violations = violation_topics
+        return True
+
+    '''
+    Write a single line listing up to max_count topics
+    '''
+    def _write_topic_changes(self, title : str, topics : list, max_count : int, level : logger.MessageLevel) -> None:
+        if len(topics) == 0:
+            return
+        more = f" (+{len(topics) - max_count} more)" if len(topics) > max_count else ""
+        self._logger.write(self._log_key, f"{title}: {', '.join(topics[:max_count])}{more}", level)
+
+    '''
+    Print every topic with its last received time and delta
+    '''
+    def _render_full_dump(self) -> None:
+        topic_list = self._topic_tracker.get_copy_topic_list_with_deltas()
+        self._logger.write(self._log_key, f"Topics: {len(topic_list)}", logger.MessageLevel.INFO)
+        for (topic, (last_time, delta, last_payload)) in topic_list.items():
+            self._logger.write(self._log_key, f'{topic:<70} {str(last_time):<30} {delta}', logger.MessageLevel.INFO)
@@ -0,0 +1,196 @@
+import datetime
+import heapq
+import threading
+from enum import Enum
+import config
+import logger
+
+class WatchdogState(Enum):
+    OK = 0
+    LATE = 1
+    RECOVERED = 2
+
+'''
+Per-topic watchdog state machine: OK -> LATE when the topic deadline passes, LATE -> RECOVERED when the topic
+is received again, RECOVERED -> OK once the topic has stayed on time for the recovery hold (config). A late
+RECOVERED topic goes straight back to LATE. Deadlines are kept in a heap with at most one live entry per topic,
+so transitions are raised the moment a deadline passes instead of on the next tick.
+'''
+class TopicWatchdog:
+
+    # Private Class Constants
+    _log_key = 'topic_watchdog'
+
+    # Topic entry fields
+    _STATE = 0
+    _LAST_TIME = 1
+    _MAX_TIME_SECONDS = 2
+    _STATE_SINCE = 3
+    _SCHEDULED_DUE = 4
+
+    '''
+    Initialize the watchdog. Fast, no fail. The deadline thread is created on start.
+    '''
+    def __init__(self,
+                 app_config : config.ConfigManager,
+                 app_logger : logger.Logger,
+                 transition_callback,
+                 clock = None) -> None:
+
+        # Locals
+        self._logger = app_logger
+        self._app_config = app_config
+        self._transition_callback = transition_callback
+        self._clock = clock if clock is not None else datetime.datetime.now
+        self._topics = dict()
+        self._late_topics = set()
+        self._deadlines = list()
+        self._deadline_condition = threading.Condition()
+        self._stop_event = threading.Event()
+        self._deadline_thread = None
+
+        # Config
+        self._recovery_hold = datetime.timedelta(seconds=self._app_config.active_config['watchdog_events']['recovery_hold_seconds'])
+        self._all_topics_max_time_seconds = self._app_config.active_config['topic_watchdog']['all']['max_time_seconds']
+        self._watchdog_list = dict()
+        for (topic, watchdog_time_seconds) in self._app_config.active_config['topic_watchdog'].items():
+            if topic != 'all':
+                self._watchdog_list[topic] = watchdog_time_seconds['max_time_seconds']
+
+    '''
+    Start the deadline thread. Not used on a virtual clock; call check_deadlines instead.
+    '''
+    def start(self) -> None:
+        self._stop_event.clear()
+        self._deadline_thread = threading.Thread(target=self._deadline_thread_run, name="topic-watchdog", daemon=True)
+        self._deadline_thread.start()
+
+    '''
+    Stop the deadline thread
+    '''
+    def stop(self) -> None:
+        self._stop_event.set()
+        with self._deadline_condition:
+            self._deadline_condition.notify()
+
+    '''
+    Called for every message tracked - moves the topic deadline and recovers late topics
+    '''
+    def topic_received(self, topic) -> None:
+        now = self._clock()
+        transition = None
+        with self._deadline_condition:
+            entry = self._topics.get(topic, None)
+            if entry is None:
+                entry = [WatchdogState.OK, now, self._get_max_time_seconds(topic), now, None]
+                self._topics[topic] = entry
+            entry[self._LAST_TIME] = now
+            if entry[self._STATE] == WatchdogState.LATE:
+                transition = self._set_state(topic, entry, WatchdogState.RECOVERED, now)
+            self._schedule(topic, entry)
+        if transition is not None:
+            self._transition_callback(transition)
+
+    '''
+    Called when a topic is no longer tracked
+    '''
+    def topic_removed(self, topic) -> None:
+        with self._deadline_condition:
+            self._topics.pop(topic, None)
+            self._late_topics.discard(topic)
+
+    '''
+    Raise the transitions for every deadline that has passed. Returns the number of transitions.
+    '''
+    def check_deadlines(self) -> int:
+        now = self._clock()
+        transitions = list()
+        with self._deadline_condition:
+            while len(self._deadlines) > 0 and self._deadlines[0][0] <= now:
+                (due, topic) = heapq.heappop(self._deadlines)
+                entry = self._topics.get(topic, None)
+                # Skip removed topics and superseded heap entries
+                if entry is None or entry[self._SCHEDULED_DUE] != due:
+                    continue
+                entry[self._SCHEDULED_DUE] = None
+                deadline = entry[self._LAST_TIME] + datetime.timedelta(seconds=entry[self._MAX_TIME_SECONDS])
+                if deadline <= now:
+                    if entry[self._STATE] != WatchdogState.LATE:
+                        transitions.append(self._set_state(topic, entry, WatchdogState.LATE, now))
+                    continue
+                if entry[self._STATE] == WatchdogState.RECOVERED and now - entry[self._STATE_SINCE] >= self._recovery_hold:
+                    transitions.append(self._set_state(topic, entry, WatchdogState.OK, now))
+                self._schedule(topic, entry)
+        for transition in transitions:
+            self._transition_callback(transition)
+        return len(transitions)
+
+    '''
+    Returns the earliest pending deadline or None
+    '''
+    def get_next_deadline(self) -> datetime.datetime:
+        with self._deadline_condition:
+            return self._deadlines[0][0] if len(self._deadlines) > 0 else None
+
+    '''
+    Returns a copy of the set of topics currently LATE
+    '''
+    def get_late_topics(self) -> set:
+        with self._deadline_condition:
+            return set(self._late_topics)
+
+    '''
+    Deadline thread - sleep until the earliest deadline, or until woken by an earlier one or stop
+    '''
+    def _deadline_thread_run(self) -> None:
+        while not self._stop_event.is_set():
+            with self._deadline_condition:
+                timeout = None
+                if len(self._deadlines) > 0:
+                    timeout = max((self._deadlines[0][0] - self._clock()).total_seconds(), 0)
+                self._deadline_condition.wait(timeout)
+            if not self._stop_event.is_set():
+                self.check_deadlines()
+
+    '''
+    Push the next wake-up for a topic if it is earlier than the one pending. Call with the lock held.
+    '''
+    def _schedule(self, topic, entry) -> None:
+        due = entry[self._LAST_TIME] + datetime.timedelta(seconds=entry[self._MAX_TIME_SECONDS])
+        if entry[self._STATE] == WatchdogState.RECOVERED:
+            due = min(due, entry[self._STATE_SINCE] + self._recovery_hold)
+        scheduled_due = entry[self._SCHEDULED_DUE]
+        if scheduled_due is not None and scheduled_due <= due:
+            return
+        entry[self._SCHEDULED_DUE] = due
+        wake_thread = len(self._deadlines) == 0 or due < self._deadlines[0][0]
+        heapq.heappush(self._deadlines, (due, topic))
+        if wake_thread:
+            self._deadline_condition.notify()
+
+    '''
+    Change a topic state and build the transition event. Call with the lock held.
+    '''
+    def _set_state(self, topic, entry, state : WatchdogState, now : datetime.datetime) -> dict:
+        previous_state = entry[self._STATE]
+        entry[self._STATE] = state
+        entry[self._STATE_SINCE] = now
+        if state == WatchdogState.LATE:
+            self._late_topics.add(topic)
+        else:
+            self._late_topics.discard(topic)
+        transition = dict()
+        transition['topic'] = topic
+        transition['state'] = state.name
+        transition['previous_state'] = previous_state.name
+        transition['time'] = now.isoformat()
+        transition['last_received'] = entry[self._LAST_TIME].isoformat()
+        transition['delta_seconds'] = (now - entry[self._LAST_TIME]).total_seconds()
+        transition['max_time_seconds'] = entry[self._MAX_TIME_SECONDS]
+        return transition
+
+    '''
+    Deadline for a topic - the tighter of the 'all' rule and the topic's own rule (config)
+    '''
+    def _get_max_time_seconds(self, topic) -> float:
+        return min(self._all_topics_max_time_seconds, self._watchdog_list.get(topic, self._all_topics_max_time_seconds))
@@ -0,0 +1,180 @@
+import datetime
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+import config
+import logger
+
+'''
+Records the incoming message stream to a compact, append-only binary file for offline replay.
+
+File layout: an 8 byte header (FILE_MAGIC) followed by records. Each record starts with a one byte tag:
+    b'T' topic definition  - topic id (u32), topic length (u16), utf8 topic
+    b'M' message           - timestamp (f64, POSIX), topic id (u32), payload kind (u8), payload length (u32),
+                             data length (u32), data
+Topics are interned on first use so a message record costs 22 bytes plus the payload, its 8 byte hash, or nothing.
+The original payload length is kept in every mode so replay can account for the bytes received.
+'''
+class TrafficRecorder:
+
+    # Public Class Constants
+    FILE_MAGIC = b'MBSREC2\n'
+    TOPIC_TAG = b'T'
+    MESSAGE_TAG = b'M'
+    TOPIC_STRUCT = struct.Struct('<cIH')
+    MESSAGE_STRUCT = struct.Struct('<cdIBII')
+    PAYLOAD_NONE = 0
+    PAYLOAD_FULL = 1
+    PAYLOAD_HASH = 2
+
+    # Private Class Constants
+    _log_key = 'recorder'
+    _PAYLOAD_MODES = {'none': PAYLOAD_NONE, 'payload': PAYLOAD_FULL, 'hash': PAYLOAD_HASH}
+
+    '''
+    Initialize the recorder. Fast, no fail. The file is created on start.
+    '''
+    def __init__(self,
+                 app_config : config.ConfigManager,
+                 app_logger : logger.Logger) -> None:
+
+        # Locals
+        self._logger = app_logger
+        self._app_config = app_config
+        self._file = None
+        self._file_path = None
+        self._file_lock = threading.Lock()
+        self._topic_ids = dict()
+        self._record_counter = 0
+        self._payload_kind = self._PAYLOAD_MODES[self._app_config.active_config['recorder']['payload_mode']]
+
+    '''
+    Create a new recording file; returns the file path. The file is created exclusively with a unique name, so an
+    existing recording is never appended to.
+    '''
+    def start(self) -> str:
+        recorder_config = self._app_config.active_config['recorder']
+        output_folder = os.path.join(os.getcwd(), recorder_config['output_folder'])
+        if not os.path.exists(output_folder):
+            os.makedirs(output_folder)
+        with self._file_lock:
+            file_stem = "traffic_{0}_{1}".format(datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f"), os.getpid())
+            attempt = 0
+            while True:
+                file_name = f"{file_stem}.mbsrec" if attempt == 0 else f"{file_stem}_{attempt}.mbsrec"
+                self._file_path = os.path.join(output_folder, file_name)
+                try:
+                    self._file = open(self._file_path, 'xb', buffering=recorder_config['buffer_bytes'])
+                    break
+                except FileExistsError:
+                    attempt += 1
+            self._file.write(self.FILE_MAGIC)
+            self._topic_ids = dict()
+        self._logger.write(self._log_key, f"Recording to {self._file_path}", logger.MessageLevel.INFO)
+        return self._file_path
+
+    '''
+    Flush and close the recording file
+    '''
+    def stop(self) -> None:
+        with self._file_lock:
+            if self._file is None:
+                return
+            self._file.close()
+            self._file = None
+        self._logger.write(self._log_key, f"Recording stopped. {self._record_counter} messages in {self._file_path}", logger.MessageLevel.INFO)
+
+    '''
+    Flush buffered records to disk
+    '''
+    def flush(self) -> None:
+        with self._file_lock:
+            if self._file is not None:
+                self._file.flush()
+
+    '''
+    Append a message record. Called for every message received - keep it cheap.
+    '''
+    def record(self, topic : str, payload : bytes, timestamp : float = None) -> None:
+        if timestamp is None:
+            timestamp = time.time()
+        if self._payload_kind == self.PAYLOAD_FULL:
+            data = payload
+        elif self._payload_kind == self.PAYLOAD_HASH:
+            data = hashlib.blake2b(payload, digest_size=8).digest()
+        else:
+            data = b''
+        with self._file_lock:
+            if self._file is None:
+                return
+            topic_id = self._topic_ids.get(topic, None)
+            if topic_id is None:
+                topic_id = len(self._topic_ids)
+                self._topic_ids[topic] = topic_id
+                topic_bytes = topic.encode('utf8')
+                self._file.write(self.TOPIC_STRUCT.pack(self.TOPIC_TAG, topic_id, len(topic_bytes)))
+                self._file.write(topic_bytes)
+            self._file.write(self.MESSAGE_STRUCT.pack(self.MESSAGE_TAG, timestamp, topic_id, self._payload_kind, len(payload), len(data)))
+            self._file.write(data)
+            self._record_counter += 1
+
+'''
+Reads a traffic recording through mmap and yields (timestamp, topic, payload kind, payload length, data) per
+message. A partial record at the end (a recording cut off by a crash or kill) ends the iteration cleanly; any
+other malformed record raises ValueError.
+'''
+class TrafficRecordingReader:
+
+    '''
+    Initialize the reader. Fast, no fail. The file is opened when iterated.
+    '''
+    def __init__(self, file_path : str) -> None:
+        self._file_path = file_path
+
+    '''
+    Iterate the message records in file order
+    '''
+    def __iter__(self):
+        recorder = TrafficRecorder
+        topic_struct = recorder.TOPIC_STRUCT
+        message_struct = recorder.MESSAGE_STRUCT
+        topics = dict()
+        with open(self._file_path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size < len(recorder.FILE_MAGIC):
+                raise ValueError(f"Not a traffic recording: {self._file_path}")
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if data[:len(recorder.FILE_MAGIC)] != recorder.FILE_MAGIC:
+                    raise ValueError(f"Not a traffic recording: {self._file_path}")
+                offset = len(recorder.FILE_MAGIC)
+                end = len(data)
+                while offset < end:
+                    tag = data[offset:offset + 1]
+                    if tag == recorder.MESSAGE_TAG:
+                        if offset + message_struct.size > end:
+                            return
+                        (_, timestamp, topic_id, payload_kind, payload_length, length) = message_struct.unpack_from(data, offset)
+                        if offset + message_struct.size + length > end:
+                            return
+                        topic = topics.get(topic_id, None)
+                        if topic is None:
+                            raise ValueError(f"Corrupt record at offset {offset} in {self._file_path}: undefined topic id {topic_id}")
+                        offset += message_struct.size
+                        payload = data[offset:offset + length]
+                        offset += length
+                        yield (timestamp, topic, payload_kind, payload_length, payload)
+                    elif tag == recorder.TOPIC_TAG:
+                        if offset + topic_struct.size > end:
+                            return
+                        (_, topic_id, length) = topic_struct.unpack_from(data, offset)
+                        if offset + topic_struct.size + length > end:
+                            return
+                        try:
+                            topics[topic_id] = data[offset + topic_struct.size:offset + topic_struct.size + length].decode('utf8')
+                        except UnicodeDecodeError:
+                            raise ValueError(f"Corrupt record at offset {offset} in {self._file_path}: topic is not utf8")
+                        offset += topic_struct.size + length
+                    else:
+                        raise ValueError(f"Corrupt record at offset {offset} in {self._file_path}")
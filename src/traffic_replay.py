@@ -0,0 +1,154 @@
+import argparse
+import time
+import config
+import logger
+import mqtt_broker_sentinel
+import traffic_recorder
+import virtual_clock
+
+'''
+Stand-in for the MQTT subscriber during replay - counts publishes instead of sending them
+'''
+class ReplayMqttClient:
+
+    '''
+    Initialize the client. Fast, no fail.
+    '''
+    def __init__(self) -> None:
+        self.publish_counter = 0
+        self.publish_bytes = 0
+
+    def mqtt_publish(self, topic, payload) -> None:
+        '''Count a payload that would have been published'''
+        self.publish_counter += 1
+        self.publish_bytes += len(payload)
+
+    def is_connected(self) -> bool:
+        '''Always connected'''
+        return True
+
+    def stop(self) -> None:
+        '''Nothing to disconnect'''
+        pass
+
+'''
+Replays a recording into a MqttBrokerSentinel at 1x, Nx or maximum speed. The sentinel runs on a virtual clock
+set from the recorded timestamps, and watchdog deadlines and scheduled jobs run on the virtual clock, so the
+results do not depend on the replay speed.
+'''
+class TrafficReplayer:
+
+    # Private Class Constants
+    _log_key = 'replay'
+
+    '''
+    Initialize the replayer. Fast, no fail. A speed of 0 replays as fast as possible. mqtt_client receives the
+    sentinel's publishes - a ReplayMqttClient or subclass (default: one that only counts them).
+    '''
+    def __init__(self,
+                 app_config : config.ConfigManager,
+                 app_logger : logger.Logger,
+                 file_path : str,
+                 speed : float = 1.0,
+                 mqtt_client = None) -> None:
+
+        # Locals
+        self._logger = app_logger
+        self._app_config = app_config
+        self._file_path = file_path
+        self._speed = speed
+        self._mqtt_client = mqtt_client if mqtt_client is not None else ReplayMqttClient()
+
+    '''
+    Replay the whole recording. Blocking. Returns replay stats.
+    '''
+    def run(self) -> dict:
+        clock = virtual_clock.VirtualClock()
+        mqtt_client = self._mqtt_client
+        sentinel = mqtt_broker_sentinel.MqttBrokerSentinel(self._logger, self._app_config, clock.now)
+
+        self._logger.write(self._log_key, f"Replaying {self._file_path} at {'max' if self._speed <= 0 else str(self._speed) + 'x'} speed...", logger.MessageLevel.INFO)
+        message_counter = 0
+        first_timestamp = None
+        last_timestamp = None
+        next_due = None
+        wall_start = time.monotonic()
+        for (timestamp, topic, payload_kind, payload_length, data) in traffic_recorder.TrafficRecordingReader(self._file_path):
+            if first_timestamp is None:
+                first_timestamp = timestamp
+                clock.set_timestamp(timestamp)
+                sentinel.start_replay(mqtt_client, clock.timestamp)
+                next_due = sentinel.replay_scheduled_jobs()
+
+            # Watchdog deadlines and scheduled jobs due before this message, in time order
+            next_due = self._advance(clock, sentinel, timestamp, next_due)
+
+            # Pace against the wall clock
+            if self._speed > 0:
+                wait_seconds = wall_start + (timestamp - first_timestamp) / self._speed - time.monotonic()
+                if wait_seconds > 0:
+                    time.sleep(wait_seconds)
+
+            clock.set_timestamp(timestamp)
+            sentinel.replay_message(topic, self._replay_payload(payload_kind, payload_length, data))
+            last_timestamp = timestamp
+            message_counter += 1
+
+        # Run the next due jobs so the end of the recording is reported
+        if first_timestamp is not None:
+            self._advance(clock, sentinel, next_due, next_due)
+
+        stats = dict()
+        stats['messages'] = message_counter
+        stats['virtual_seconds'] = 0 if first_timestamp is None else last_timestamp - first_timestamp
+        stats['wall_seconds'] = time.monotonic() - wall_start
+        stats['published_messages'] = mqtt_client.publish_counter
+        stats['published_bytes'] = mqtt_client.publish_bytes
+        self._logger.write(self._log_key, f"Replay complete: {stats}", logger.MessageLevel.INFO)
+        return stats
+
+    '''
+    Rebuild the payload for a message. Hash and none recordings replay a placeholder of the original length,
+    starting with the hash so payload changes still show, so byte counts and memory match the live run.
+    '''
+    def _replay_payload(self, payload_kind : int, payload_length : int, data : bytes) -> bytes:
+        if payload_kind == traffic_recorder.TrafficRecorder.PAYLOAD_FULL:
+            return data
+        return data[:payload_length].ljust(payload_length, b'\0')
+
+    '''
+    Move the virtual clock up to timestamp, stopping at each watchdog deadline and scheduled job on the way.
+    Returns the next scheduled job due time.
+    '''
+    def _advance(self, clock, sentinel, timestamp : float, next_due : float) -> float:
+        while True:
+            next_deadline = sentinel.replay_next_deadline()
+            next_deadline_timestamp = next_deadline.timestamp() if next_deadline is not None else None
+            if next_deadline_timestamp is not None and next_deadline_timestamp <= timestamp and next_deadline_timestamp <= next_due:
+                clock.set_time(next_deadline)
+                sentinel.replay_deadlines()
+            elif next_due <= timestamp:
+                clock.set_timestamp(next_due)
+                next_due = sentinel.replay_scheduled_jobs()
+            else:
+                return next_due
+
+'''
+Replay Entry Point
+'''
+if __name__ == '__main__':
+
+    # Initialize the logger
+    app_logger = logger.Logger()
+
+    # Parse Arguments
+    arg_parser = argparse.ArgumentParser(
+                        prog='MQTT Broker Sentinel Replay',
+                        description='Replays a traffic recording through the sentinel.')
+    arg_parser.add_argument('file')                                                     # Recording file
+    arg_parser.add_argument('-s', '--speed', type=float, default=1.0)                   # Speed multiplier, 0 = max
+    args = arg_parser.parse_args()
+
+    # Replay with the app config
+    app_config = config.ConfigManager("mqtt-broker-sentinel.json", app_logger)
+    TrafficReplayer(app_config, app_logger, args.file, args.speed).run()
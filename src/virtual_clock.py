@@ -0,0 +1,51 @@
+import datetime
+import threading
+
+'''
+Settable clock used in place of datetime.datetime.now so replayed traffic drives watchdog timing deterministically
+'''
+class VirtualClock:
+
+    '''
+    Initialize the clock at the given time (default: now)
+    '''
+    def __init__(self, start_time : datetime.datetime = None) -> None:
+        self._now = start_time if start_time is not None else datetime.datetime.now()
+        self._timestamp = self._now.timestamp()
+        self._clock_lock = threading.Lock()
+
+    '''
+    Returns the current virtual time - same signature as datetime.datetime.now
+    '''
+    def now(self) -> datetime.datetime:
+        return self._now
+
+    '''
+    Returns the current virtual time as a POSIX timestamp - exactly the value last set, for scheduler due times
+    '''
+    def timestamp(self) -> float:
+        return self._timestamp
+
+    '''
+    Set the virtual time
+    '''
+    def set_time(self, now : datetime.datetime) -> None:
+        with self._clock_lock:
+            self._now = now
+            self._timestamp = now.timestamp()
+
+    '''
+    Set the virtual time from a POSIX timestamp
+    '''
+    def set_timestamp(self, timestamp : float) -> None:
+        with self._clock_lock:
+            self._now = datetime.datetime.fromtimestamp(timestamp)
+            self._timestamp = timestamp
+
+    '''
+    Move the virtual time forward
+    '''
+    def advance(self, seconds : float) -> None:
+        with self._clock_lock:
+            self._now = self._now + datetime.timedelta(seconds=seconds)
+            self._timestamp = self._now.timestamp()
@@ -0,0 +1,31 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+import config
+import logger
+
+'''
+Logger that drops every message
+'''
+class QuietLogger(logger.Logger):
+
+    def write(self, key, msg, level = logger.MessageLevel.INFO) -> None:
+        pass
+
+    def write_single_line_no_header(self, msg) -> None:
+        pass
+
+@pytest.fixture
+def app_logger():
+    return QuietLogger()
+
+@pytest.fixture
+def app_config(app_logger):
+    # Default config without touching conf/ on disk
+    app_config = config.ConfigManager.__new__(config.ConfigManager)
+    app_config._app_logger = app_logger
+    app_config.set_as_default_config()
+    return app_config
@@ -0,0 +1,73 @@
+import datetime
+import json
+import zlib
+import pytest
+import document_encoder
+import mqtt_topic_tracker
+
+ENTRIES = [(f"site/{i}/state", '2026-01-01T00:00:00', float(i), b'payload') for i in range(5)]
+
+def encoder(app_config, encoding, page_size = 0):
+    return document_encoder.DocumentEncoder(app_config, encoding, page_size)
+
+@pytest.mark.parametrize('value, encoded', [
+    (0, '00'),
+    (23, '17'),
+    (24, '1818'),
+    (1000000, '1a000f4240'),
+    (1000000000000, '1b000000e8d4a51000'),
+    (-1, '20'),
+    (-1000, '3903e7'),
+    (1.1, 'fb3ff199999999999a'),
+    (True, 'f5'),
+    (False, 'f4'),
+    (None, 'f6'),
+    ('IETF', '6449455446'),
+    (b'\x01\x02\x03\x04', '4401020304'),
+    ([1, [2, 3], [4, 5]], '8301820203820405'),
+    ({'a': 1, 'b': [2, 3]}, 'a26161016162820203'),
+])
+def test_cbor_rfc8949_vectors(app_config, value, encoded):
+    assert encoder(app_config, 'cbor').encode_document(value).hex() == encoded
+
+def test_cbor_topic_document_is_indefinite_map(app_config):
+    app_config.active_config['publish']['include_payloads'] = True
+    [(document, entry_count)] = list(encoder(app_config, 'cbor').encode_entries(ENTRIES[:1]))
+    assert entry_count == 1
+    assert document[0] == 0xbf and document[-1] == 0xff
+    # key, then [time, delta, raw payload bytes]
+    assert document[1:-1].hex() == '6c736974652f302f7374617465' + '83' + '73' + b'2026-01-01T00:00:00'.hex() + 'fb0000000000000000' + '47' + b'payload'.hex()
+
+def test_json_matches_legacy_topic_list(app_config, app_logger):
+    now = datetime.datetime(2026, 1, 1)
+    tracker = mqtt_topic_tracker.MqttTopicTracker(app_config, app_logger, lambda: now)
+    for i in range(20):
+        tracker.new_topic_data_received(f"site/{i % 3}/device/{i}", b'x' * i)
+    [(document, entry_count)] = list(encoder(app_config, 'json').encode_entries(tracker.iter_topic_entries()))
+    assert entry_count == 20
+    assert document == tracker.get_json_topic_list()
+
+@pytest.mark.parametrize('encoding', ['json', 'json_compact', 'zlib_json'])
+def test_pages_split_entries(app_config, encoding):
+    pages = list(encoder(app_config, encoding, 2).encode_entries(ENTRIES))
+    assert [entry_count for (document, entry_count) in pages] == [2, 2, 1]
+    merged = dict()
+    for (document, entry_count) in pages:
+        if encoding == 'zlib_json':
+            document = zlib.decompress(document).decode('utf8')
+        page = json.loads(document)
+        assert len(page) == entry_count
+        merged.update(page)
+    assert list(merged) == [entry[0] for entry in ENTRIES]
+
+def test_json_compact_drops_payloads(app_config):
+    [(document, entry_count)] = list(encoder(app_config, 'json_compact').encode_entries(ENTRIES[:1]))
+    assert document == '{"site/0/state":["2026-01-01T00:00:00",0.0]}'
+
+def test_empty_document_is_one_empty_page(app_config):
+    assert list(encoder(app_config, 'json', 2).encode_entries([])) == [('{}', 0)]
+    assert list(encoder(app_config, 'cbor').encode_entries([])) == [(b'\xbf\xff', 0)]
+
+def test_unknown_encoding_is_rejected(app_config):
+    with pytest.raises(ValueError):
+        encoder(app_config, 'xml')
@@ -0,0 +1,52 @@
+import collections
+import datetime
+import random
+import heavy_hitters
+
+def test_space_saving_exact_under_capacity():
+    counter = heavy_hitters.SpaceSaving(4)
+    for key in 'aabbbc':
+        counter.update(key)
+    assert counter.get_counts() == {'a': 2, 'b': 3, 'c': 1}
+
+def test_space_saving_takes_over_smallest_counter():
+    counter = heavy_hitters.SpaceSaving(2)
+    for key in 'aaab':
+        counter.update(key)
+    counter.update('c')
+    # 'b' (1) is replaced; 'c' inherits its count as the over-estimate
+    assert counter.get_counts() == {'a': 3, 'c': 2}
+
+def test_space_saving_finds_heavy_keys_with_bounded_error():
+    random.seed(2)
+    stream = ['hot%d' % (i % 3) if random.random() < 0.3 else 'cold%d' % random.randint(0, 100000) for i in range(20000)]
+    exact_counts = collections.Counter(stream)
+    capacity = 50
+    counter = heavy_hitters.SpaceSaving(capacity)
+    for key in stream:
+        counter.update(key)
+    counts = counter.get_counts()
+    assert len(counts) == capacity
+    for key in ('hot0', 'hot1', 'hot2'):
+        # Never under-counts, over-counts by at most N / capacity
+        assert exact_counts[key] <= counts[key] <= exact_counts[key] + len(stream) // capacity
+
+def test_heavy_hitters_windows_expire(app_config):
+    app_config.active_config['heavy_hitters']['bucket_seconds'] = 10
+    app_config.active_config['heavy_hitters']['window_seconds'] = [60, 600]
+    top_talkers = heavy_hitters.HeavyHitters(app_config)
+    start = datetime.datetime(2026, 1, 1)
+    for i in range(5):
+        top_talkers.update('site/a/state', 100, start)
+    top_talkers.update('other/b', 1000, start)
+
+    now = start + datetime.timedelta(seconds=30)
+    top = top_talkers.get_top_talkers(now)
+    assert top['60s']['topic_msgs'][0] == ['site/a/state', 5]
+    assert top['60s']['topic_bytes'][0] == ['other/b', 1000]
+    assert top['60s']['prefix_msgs'][0] == ['site', 5]
+
+    now = start + datetime.timedelta(seconds=120)
+    top = top_talkers.get_top_talkers(now)
+    assert top['60s']['topic_msgs'] == []
+    assert top['600s']['topic_msgs'][0] == ['site/a/state', 5]
@@ -0,0 +1,152 @@
+import datetime
+import pytest
+import mqtt_topic_tracker
+import virtual_clock
+
+PROTECTED_TOPIC = 'amiweather/8/temperature'
+
+@pytest.fixture
+def clock():
+    return virtual_clock.VirtualClock(datetime.datetime(2026, 1, 1))
+
+@pytest.fixture
+def removed_topics():
+    return list()
+
+def make_tracker(app_config, app_logger, clock, removed_topics, **limits):
+    for (key, value) in limits.items():
+        app_config.active_config['topic_tracker'][key] = value
+    return mqtt_topic_tracker.MqttTopicTracker(app_config, app_logger, clock.now, topic_removed_callback=removed_topics.append)
+
+def topics(tracker):
+    return [entry[0] for entry in tracker.iter_topic_entries()]
+
+def test_received_callback_runs_outside_tracker_lock(app_config, app_logger):
+    lock_held = list()
+    tracker = mqtt_topic_tracker.MqttTopicTracker(app_config, app_logger, topic_received_callback=lambda topic: lock_held.append(tracker._topics_lock.locked()))
+    tracker.new_topic_data_received('a', b'1')
+    tracker.new_topic_data_received('a', b'2')
+    assert lock_held == [False, False]
+
+def test_iter_topic_entries_for_given_topics(app_config, app_logger):
+    tracker = mqtt_topic_tracker.MqttTopicTracker(app_config, app_logger)
+    for topic in ('c', 'a', 'b'):
+        tracker.new_topic_data_received(topic, b'1')
+    assert topics(tracker) == ['c', 'a', 'b']
+    assert [entry[0] for entry in tracker.iter_topic_entries({'b', 'a', 'gone'})] == ['a', 'b']
+
+def test_max_topics_evicts_least_recently_received(app_config, app_logger, clock, removed_topics):
+    tracker = make_tracker(app_config, app_logger, clock, removed_topics, max_topics=3)
+    for topic in ('a', 'b', 'c'):
+        assert tracker.new_topic_data_received(topic, b'1')
+    tracker.new_topic_data_received('a', b'2')
+    assert tracker.new_topic_data_received('d', b'1')
+    assert topics(tracker) == ['c', 'a', 'd']
+    assert removed_topics == ['b']
+    stats = tracker.get_topic_stats()
+    assert stats['evicted_count'] == 1 and stats['topic_count'] == 3
+
+def test_watchdog_rule_topics_are_protected(app_config, app_logger, clock, removed_topics):
+    tracker = make_tracker(app_config, app_logger, clock, removed_topics, max_topics=2)
+    tracker.new_topic_data_received(PROTECTED_TOPIC, b'1')
+    tracker.new_topic_data_received('a', b'1')
+    tracker.new_topic_data_received('b', b'1')
+    tracker.new_topic_data_received('c', b'1')
+    assert topics(tracker) == [PROTECTED_TOPIC, 'c']
+    assert removed_topics == ['a', 'b']
+
+def test_memory_budget_evicts_oldest(app_config, app_logger, clock, removed_topics):
+    probe = make_tracker(app_config, app_logger, clock, list())
+    probe.new_topic_data_received('a', b'x' * 10)
+    entry_bytes = probe.get_topic_stats()['topic_memory_bytes']
+    tracker = make_tracker(app_config, app_logger, clock, removed_topics, max_memory_bytes=3 * entry_bytes)
+    for topic in ('a', 'b', 'c', 'd', 'e'):
+        tracker.new_topic_data_received(topic, b'x' * 10)
+    assert removed_topics == ['a', 'b']
+    assert topics(tracker) == ['c', 'd', 'e']
+    stats = tracker.get_topic_stats()
+    assert stats['topic_memory_bytes'] == 3 * entry_bytes and stats['evicted_count'] == 2
+
+def test_memory_is_accounted_on_update_and_eviction(app_config, app_logger, clock, removed_topics):
+    tracker = make_tracker(app_config, app_logger, clock, removed_topics)
+    tracker.new_topic_data_received('a', b'x' * 10)
+    small = tracker.get_topic_stats()['topic_memory_bytes']
+    tracker.new_topic_data_received('a', b'x' * 1010)
+    assert tracker.get_topic_stats()['topic_memory_bytes'] == small + 1000
+    tracker.new_topic_data_received('a', b'x' * 10)
+    assert tracker.get_topic_stats()['topic_memory_bytes'] == small
+
+def test_oversize_entry_is_kept_without_flushing_others(app_config, app_logger, clock, removed_topics):
+    tracker = make_tracker(app_config, app_logger, clock, removed_topics, max_memory_bytes=2000)
+    for topic in ('a', 'b', 'c'):
+        tracker.new_topic_data_received(topic, b'x')
+    assert tracker.new_topic_data_received('big', b'x' * 100000)
+    assert topics(tracker) == ['a', 'b', 'c', 'big']
+    assert removed_topics == []
+
+def test_payload_growth_evicts_older_topics(app_config, app_logger, clock, removed_topics):
+    tracker = make_tracker(app_config, app_logger, clock, removed_topics, max_memory_bytes=2000)
+    for topic in ('a', 'b', 'c'):
+        tracker.new_topic_data_received(topic, b'x')
+    tracker.new_topic_data_received('c', b'x' * 1200)
+    assert 'c' in topics(tracker)
+    assert removed_topics[0] == 'a'
+    assert tracker.get_topic_stats()['topic_memory_bytes'] <= 2000
+
+def test_dormant_topics_are_evicted_oldest_first(app_config, app_logger, clock, removed_topics):
+    tracker = make_tracker(app_config, app_logger, clock, removed_topics, dormant_eviction_seconds=60)
+    tracker.new_topic_data_received('a', b'1')
+    tracker.new_topic_data_received(PROTECTED_TOPIC, b'1')
+    clock.advance(30)
+    tracker.new_topic_data_received('b', b'1')
+    clock.advance(30)
+    tracker.new_topic_data_received('c', b'1')
+    assert tracker.evict_dormant_topics() == 0
+    clock.advance(1)
+    assert tracker.evict_dormant_topics() == 1
+    assert removed_topics == ['a']
+    clock.advance(30)
+    assert tracker.evict_dormant_topics() == 1
+    assert topics(tracker) == [PROTECTED_TOPIC, 'c']
+    assert tracker.get_topic_stats()['evicted_count'] == 2
+
+def test_dormant_eviction_disabled_by_zero(app_config, app_logger, clock, removed_topics):
+    tracker = make_tracker(app_config, app_logger, clock, removed_topics, dormant_eviction_seconds=0)
+    tracker.new_topic_data_received('a', b'1')
+    clock.advance(100000)
+    assert tracker.evict_dormant_topics() == 0
+
+def test_evictions_are_reported_as_changes(app_config, app_logger, clock, removed_topics):
+    tracker = make_tracker(app_config, app_logger, clock, removed_topics, max_topics=1)
+    tracker.new_topic_data_received('a', b'1')
+    tracker.new_topic_data_received('b', b'1')
+    (topic_counts, new_topics, evicted_topics) = tracker.drain_changes()
+    assert topic_counts == {'b': 1} and new_topics == ['a', 'b'] and evicted_topics == ['a']
+
+def test_aggregate_filters_share_one_entry(app_config, app_logger, clock, removed_topics):
+    tracker = make_tracker(app_config, app_logger, clock, removed_topics, aggregate_filters=['devices/+/state', 'logs/#'])
+    assert tracker.new_topic_data_received('devices/1/state', b'1')
+    assert not tracker.new_topic_data_received('devices/2/state', b'1')
+    tracker.new_topic_data_received('devices/2/state/extra', b'1')
+    tracker.new_topic_data_received('logs', b'1')
+    tracker.new_topic_data_received('logs/a/b', b'1')
+    tracker.new_topic_data_received('logsx', b'1')
+    assert topics(tracker) == ['devices/+/state', 'devices/2/state/extra', 'logs/#', 'logsx']
+
+@pytest.mark.parametrize('topic_filter, topic, matches', [
+    ('a/#', 'a', True),
+    ('a/#', 'a/', True),
+    ('a/#', 'a/b/c', True),
+    ('a/#', 'ab', False),
+    ('a/#', 'b/a', False),
+    ('#', 'x/y', True),
+    ('a/+', 'a/b', True),
+    ('a/+', 'a/b/c', False),
+    ('a/+', 'a', False),
+    ('+/b', 'x/b', True),
+    ('+/#', 'a', True),
+    ('a.b/+', 'axb/c', False),
+])
+def test_topic_filter_matching(app_config, app_logger, topic_filter, topic, matches):
+    tracker = mqtt_topic_tracker.MqttTopicTracker(app_config, app_logger)
+    assert bool(tracker._topic_filter_to_regex(topic_filter).fullmatch(topic)) == matches
@@ -0,0 +1,101 @@
+import pytest
+import scheduler
+
+'''
+Settable scheduler clock in seconds
+'''
+class FakeClock:
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+@pytest.fixture
+def job_scheduler(app_logger, clock):
+    return scheduler.Scheduler(app_logger, 0.5, clock)
+
+def test_jobs_run_immediately_then_on_interval(job_scheduler, clock):
+    runs = list()
+    job_scheduler.add_job('fast', 1.0, lambda: runs.append(('fast', clock.now)))
+    job_scheduler.add_job('slow', 5.0, lambda: runs.append(('slow', clock.now)))
+    assert job_scheduler.run_pending() == 1001.0
+    for i in range(5):
+        clock.now += 1.0
+        job_scheduler.run_pending()
+    assert [name for (name, now) in runs].count('fast') == 6
+    assert [name for (name, now) in runs].count('slow') == 2
+    stats = job_scheduler.get_job_stats()
+    assert stats['fast']['runs'] == 6 and stats['fast']['late'] == 0 and stats['fast']['skipped'] == 0
+
+def test_not_run_before_due(job_scheduler, clock):
+    runs = list()
+    job_scheduler.add_job('job', 10.0, lambda: runs.append(clock.now))
+    job_scheduler.run_pending()
+    clock.now += 9.9
+    assert job_scheduler.run_pending() == 1010.0
+    assert runs == [1000.0]
+
+def test_due_times_do_not_drift(job_scheduler, clock):
+    job_scheduler.add_job('job', 10.0, lambda: None)
+    job_scheduler.run_pending()
+    # Starting within the tolerance is on time, and the next due time stays on the original grid
+    clock.now = 1010.4
+    assert job_scheduler.run_pending() == 1020.0
+    assert job_scheduler.get_job_stats()['job']['late'] == 0
+
+def test_late_beyond_tolerance_is_counted(job_scheduler, clock):
+    job_scheduler.add_job('job', 10.0, lambda: None)
+    job_scheduler.run_pending()
+    clock.now = 1011.0
+    assert job_scheduler.run_pending() == 1020.0
+    stats = job_scheduler.get_job_stats()['job']
+    assert stats['late'] == 1 and stats['skipped'] == 0 and stats['runs'] == 2
+
+def test_missed_intervals_are_skipped_not_replayed(job_scheduler, clock):
+    runs = list()
+    job_scheduler.add_job('job', 10.0, lambda: runs.append(clock.now))
+    job_scheduler.run_pending()
+    clock.now = 1035.0
+    assert job_scheduler.run_pending() == 1040.0
+    assert job_scheduler.run_pending() == 1040.0
+    stats = job_scheduler.get_job_stats()['job']
+    assert runs == [1000.0, 1035.0]
+    assert stats['late'] == 1 and stats['skipped'] == 2
+
+def test_failing_job_is_counted_and_rescheduled(job_scheduler, clock):
+    def fail():
+        raise RuntimeError('boom')
+    job_scheduler.add_job('fail', 1.0, fail)
+    job_scheduler.run_pending()
+    clock.now += 1.0
+    assert job_scheduler.run_pending() == 1002.0
+    stats = job_scheduler.get_job_stats()['fail']
+    assert stats['errors'] == 2 and stats['runs'] == 2
+
+def test_durations_are_recorded(job_scheduler, clock):
+    def slow_job():
+        clock.now += 0.25
+    job_scheduler.add_job('slow', 10.0, slow_job)
+    job_scheduler.run_pending()
+    stats = job_scheduler.get_job_stats()['slow']
+    assert stats['last_duration_seconds'] == 0.25 and stats['max_duration_seconds'] == 0.25
+
+def test_stop_wakes_the_thread(app_logger):
+    job_scheduler = scheduler.Scheduler(app_logger, 0.5)
+    job_scheduler.add_job('idle', 3600.0, lambda: None)
+    job_scheduler.start()
+    job_scheduler.stop()
+    job_scheduler.join(1.0)
+    assert not job_scheduler.is_alive()
+
+@pytest.mark.parametrize('interval_seconds', [0, 0.0, -1.0, float('nan')])
+def test_non_positive_interval_is_rejected(job_scheduler, interval_seconds):
+    with pytest.raises(ValueError):
+        job_scheduler.add_job('bad', interval_seconds, lambda: None)
+    assert job_scheduler.get_job_stats() == {}
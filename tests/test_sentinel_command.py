@@ -0,0 +1,37 @@
+import pytest
+import sentinel_command
+
+def test_bare_command_name():
+    command = sentinel_command.SentinelCommand.parse(b' status_dump\n')
+    assert command.name == 'status_dump' and command.seconds is None
+
+def test_json_command():
+    command = sentinel_command.SentinelCommand.parse(b'{"command": "profile", "seconds": 10}')
+    assert command.name == 'profile' and command.seconds == 10.0
+
+def test_numeric_string_seconds():
+    assert sentinel_command.SentinelCommand.parse(b'{"command": "profile", "seconds": "2.5"}').seconds == 2.5
+
+@pytest.mark.parametrize('payload', [
+    b'{"command": "profile", "seconds": "abc"}',
+    b'{"command": "profile", "seconds": [1]}',
+    b'{"command": "profile", "seconds": true}',
+    b'{"command": "profile", "seconds": "nan"}',
+    b'{"command": "profile", "seconds": "inf"}',
+    b'{"command": "profile", "seconds": 1e999}',
+    b'{"command": "profile", "seconds": -5}',
+    b'{"command": "profile", "seconds": 0}',
+])
+def test_invalid_seconds_rejected(payload):
+    with pytest.raises(ValueError):
+        sentinel_command.SentinelCommand.parse(payload)
+
+@pytest.mark.parametrize('payload', [b'reboot', b'{"command": "reboot"}', b'{"seconds": 5}', b'', b'{"command": 5}'])
+def test_unknown_command_rejected(payload):
+    with pytest.raises(ValueError):
+        sentinel_command.SentinelCommand.parse(payload)
+
+@pytest.mark.parametrize('payload', [b'\xff\xfe', b'{"command": ', b'{"command": "profile"'])
+def test_malformed_payload_rejected(payload):
+    with pytest.raises(ValueError):
+        sentinel_command.SentinelCommand.parse(payload)
@@ -0,0 +1,20 @@
+import os
+import sys
+import sentinel_profiler
+
+def test_capture_is_clamped_to_max_seconds(app_config, app_logger, tmp_path):
+    app_config.active_config['profiler']['max_seconds'] = 0.05
+    app_config.active_config['profiler']['output_folder'] = str(tmp_path)
+    summaries = list()
+    profiler = sentinel_profiler.SentinelProfiler(app_config, app_logger, summaries.append)
+    assert profiler.request_capture(1e9)
+    profiler._capture_thread.join(10.0)
+    assert not profiler.is_capturing()
+    assert summaries[0]['duration_seconds'] < 5.0
+    assert os.path.exists(summaries[0]['report_file'])
+
+def test_self_key_is_the_executing_line(app_config, app_logger):
+    profiler = sentinel_profiler.SentinelProfiler(app_config, app_logger, None)
+    frame = sys._getframe()
+    assert profiler._line_key(frame) == f"test_sentinel_profiler.py:{frame.f_lineno}(test_self_key_is_the_executing_line)"
+    assert profiler._frame_key(frame) == f"test_sentinel_profiler.py:{frame.f_code.co_firstlineno}(test_self_key_is_the_executing_line)"
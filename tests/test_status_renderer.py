@@ -0,0 +1,149 @@
+import datetime
+import pytest
+import logger
+import mqtt_topic_tracker
+import status_renderer
+import virtual_clock
+
+'''
+Logger that keeps the messages written
+'''
+class RecordingLogger(logger.Logger):
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.messages = list()
+
+    def write(self, key, msg, level = logger.MessageLevel.INFO) -> None:
+        self.messages.append((msg, level))
+
+    def write_single_line_no_header(self, msg) -> None:
+        pass
+
+'''
+Watchdog stand-in with a settable LATE set
+'''
+class FakeWatchdog:
+
+    def __init__(self) -> None:
+        self.late_topics = set()
+        self.calls = 0
+
+    def get_late_topics(self) -> set:
+        self.calls += 1
+        return set(self.late_topics)
+
+@pytest.fixture
+def clock():
+    return virtual_clock.VirtualClock(datetime.datetime(2026, 1, 1))
+
+@pytest.fixture
+def recording_logger():
+    return RecordingLogger()
+
+@pytest.fixture
+def watchdog():
+    return FakeWatchdog()
+
+@pytest.fixture
+def tracker(app_config, app_logger, clock):
+    return mqtt_topic_tracker.MqttTopicTracker(app_config, app_logger, clock.now)
+
+def make_renderer(app_config, recording_logger, tracker, watchdog, clock, **status_view):
+    app_config.active_config['status_view']['top_n'] = 10
+    app_config.active_config['status_view']['min_period_seconds'] = 0
+    app_config.active_config['status_view']['full_dump_every_n_renders'] = 0
+    for (key, value) in status_view.items():
+        app_config.active_config['status_view'][key] = value
+    return status_renderer.StatusRenderer(app_config, recording_logger, tracker, watchdog, clock.now)
+
+def summary(recording_logger):
+    return [msg for (msg, level) in recording_logger.messages if msg.startswith('Topics: ') and '|' in msg]
+
+def full_dumps(recording_logger):
+    return [msg for (msg, level) in recording_logger.messages if msg.startswith('Topics: ') and '|' not in msg]
+
+def lines_starting(recording_logger, prefix):
+    return [msg for (msg, level) in recording_logger.messages if msg.startswith(prefix)]
+
+def test_summary_reports_period_changes(app_config, recording_logger, tracker, watchdog, clock):
+    renderer = make_renderer(app_config, recording_logger, tracker, watchdog, clock)
+    for i in range(4):
+        tracker.new_topic_data_received('a', b'1')
+    tracker.new_topic_data_received('b', b'1')
+    clock.advance(10)
+    assert renderer.render()
+    assert summary(recording_logger)[-1].startswith('Topics: 2 (+2 new, -0 evicted, 2 updated) | Msgs: 5 in 10.0s (0.5/s) | Violations: 0')
+    assert lines_starting(recording_logger, 'New topics: ') == ['New topics: a, b']
+
+def test_changes_are_drained_by_each_render(app_config, recording_logger, tracker, watchdog, clock):
+    renderer = make_renderer(app_config, recording_logger, tracker, watchdog, clock)
+    tracker.new_topic_data_received('a', b'1')
+    clock.advance(1)
+    renderer.render()
+    clock.advance(1)
+    renderer.render()
+    assert summary(recording_logger)[-1].startswith('Topics: 1 (+0 new, -0 evicted, 0 updated) | Msgs: 0 ')
+    assert tracker.drain_changes() == ({}, [], [])
+
+def test_min_period_throttle_carries_changes_over(app_config, recording_logger, tracker, watchdog, clock):
+    renderer = make_renderer(app_config, recording_logger, tracker, watchdog, clock, min_period_seconds=5)
+    clock.advance(5)
+    assert renderer.render()
+    tracker.new_topic_data_received('a', b'1')
+    clock.advance(2)
+    assert not renderer.render()
+    assert watchdog.calls == 1
+    tracker.new_topic_data_received('b', b'1')
+    clock.advance(3)
+    assert renderer.render()
+    assert summary(recording_logger)[-1].startswith('Topics: 2 (+2 new, -0 evicted, 2 updated) | Msgs: 2 in 5.0s')
+
+def test_violation_diffs(app_config, recording_logger, tracker, watchdog, clock):
+    renderer = make_renderer(app_config, recording_logger, tracker, watchdog, clock)
+    watchdog.late_topics = {'a'}
+    renderer.render()
+    watchdog.late_topics = {'a', 'b'}
+    renderer.render()
+    watchdog.late_topics = {'b'}
+    renderer.render()
+    renderer.render()
+    assert [(msg, level) for (msg, level) in recording_logger.messages if 'violations: ' in msg] == [
+        ('New violations: a', logger.MessageLevel.WARN),
+        ('New violations: b', logger.MessageLevel.WARN),
+        ('Cleared violations: a', logger.MessageLevel.INFO),
+    ]
+    assert summary(recording_logger)[-1].endswith('Violations: 1')
+
+def test_full_dump_on_request(app_config, recording_logger, tracker, watchdog, clock):
+    renderer = make_renderer(app_config, recording_logger, tracker, watchdog, clock)
+    tracker.new_topic_data_received('a', b'1')
+    tracker.new_topic_data_received('b', b'1')
+    renderer.render()
+    assert full_dumps(recording_logger) == []
+    renderer.request_full_dump()
+    renderer.render()
+    assert full_dumps(recording_logger) == ['Topics: 2']
+    renderer.render()
+    assert full_dumps(recording_logger) == ['Topics: 2']
+
+def test_full_dump_every_n_renders(app_config, recording_logger, tracker, watchdog, clock):
+    renderer = make_renderer(app_config, recording_logger, tracker, watchdog, clock, full_dump_every_n_renders=3)
+    tracker.new_topic_data_received('a', b'1')
+    dumps = list()
+    for i in range(7):
+        renderer.render()
+        dumps.append(len(full_dumps(recording_logger)))
+    assert dumps == [0, 0, 1, 1, 1, 2, 2]
+
+def test_top_n_limits_output(app_config, recording_logger, tracker, watchdog, clock):
+    renderer = make_renderer(app_config, recording_logger, tracker, watchdog, clock, top_n=2)
+    for i in range(5):
+        for j in range(i + 1):
+            tracker.new_topic_data_received(f't{i}', b'1')
+    clock.advance(1)
+    renderer.render()
+    rate_lines = lines_starting(recording_logger, '  rate  ')
+    assert [line.split()[1] for line in rate_lines] == ['t4', 't3']
+    assert len(lines_starting(recording_logger, '  stale ')) == 2
+    assert lines_starting(recording_logger, 'New topics: ') == ['New topics: t0, t1 (+3 more)']
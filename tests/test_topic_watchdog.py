@@ -0,0 +1,101 @@
+import datetime
+import pytest
+import topic_watchdog
+import virtual_clock
+
+@pytest.fixture
+def clock():
+    return virtual_clock.VirtualClock(datetime.datetime(2026, 1, 1))
+
+@pytest.fixture
+def transitions():
+    return list()
+
+@pytest.fixture
+def watchdog(app_config, app_logger, clock, transitions):
+    app_config.active_config['topic_watchdog']['all']['max_time_seconds'] = 10
+    app_config.active_config['topic_watchdog']['fast/topic'] = {'max_time_seconds': 2}
+    app_config.active_config['watchdog_events']['recovery_hold_seconds'] = 5
+    return topic_watchdog.TopicWatchdog(app_config, app_logger, transitions.append, clock.now)
+
+def step(clock, watchdog, seconds):
+    for i in range(seconds):
+        clock.advance(1)
+        watchdog.check_deadlines()
+
+def states(transitions):
+    return [(transition['topic'], transition['previous_state'], transition['state']) for transition in transitions]
+
+def test_on_time_topic_stays_ok(clock, watchdog, transitions):
+    for i in range(30):
+        watchdog.topic_received('a')
+        step(clock, watchdog, 5)
+    assert transitions == []
+    assert watchdog.get_late_topics() == set()
+
+def test_late_exactly_at_deadline(clock, watchdog, transitions):
+    watchdog.topic_received('a')
+    step(clock, watchdog, 9)
+    assert transitions == []
+    step(clock, watchdog, 1)
+    assert states(transitions) == [('a', 'OK', 'LATE')]
+    assert transitions[0]['delta_seconds'] == 10.0
+    assert watchdog.get_late_topics() == {'a'}
+
+def test_late_is_raised_once(clock, watchdog, transitions):
+    watchdog.topic_received('a')
+    step(clock, watchdog, 60)
+    assert states(transitions) == [('a', 'OK', 'LATE')]
+
+def test_recovery_hold_then_ok(clock, watchdog, transitions):
+    watchdog.topic_received('a')
+    step(clock, watchdog, 10)
+    watchdog.topic_received('a')
+    assert states(transitions)[-1] == ('a', 'LATE', 'RECOVERED')
+    assert watchdog.get_late_topics() == set()
+    step(clock, watchdog, 4)
+    assert len(transitions) == 2
+    step(clock, watchdog, 1)
+    assert states(transitions)[-1] == ('a', 'RECOVERED', 'OK')
+
+def test_late_again_during_recovery_hold(clock, transitions, app_config, app_logger):
+    app_config.active_config['topic_watchdog']['all']['max_time_seconds'] = 10
+    app_config.active_config['watchdog_events']['recovery_hold_seconds'] = 30
+    watchdog = topic_watchdog.TopicWatchdog(app_config, app_logger, transitions.append, clock.now)
+    watchdog.topic_received('a')
+    step(clock, watchdog, 10)
+    watchdog.topic_received('a')
+    step(clock, watchdog, 10)
+    assert states(transitions) == [('a', 'OK', 'LATE'), ('a', 'LATE', 'RECOVERED'), ('a', 'RECOVERED', 'LATE')]
+    assert watchdog.get_late_topics() == {'a'}
+
+def test_topic_rule_tighter_than_all(clock, watchdog, transitions):
+    watchdog.topic_received('fast/topic')
+    watchdog.topic_received('a')
+    step(clock, watchdog, 2)
+    assert states(transitions) == [('fast/topic', 'OK', 'LATE')]
+    assert transitions[0]['max_time_seconds'] == 2
+
+def test_removed_topic_is_dropped(clock, watchdog, transitions):
+    watchdog.topic_received('a')
+    watchdog.topic_received('b')
+    step(clock, watchdog, 10)
+    assert watchdog.get_late_topics() == {'a', 'b'}
+    watchdog.topic_removed('a')
+    assert watchdog.get_late_topics() == {'b'}
+    watchdog.topic_received('b')
+    step(clock, watchdog, 30)
+    assert all(transition['topic'] != 'a' for transition in transitions[2:])
+
+def test_late_topics_is_a_copy(clock, watchdog):
+    watchdog.topic_received('a')
+    step(clock, watchdog, 10)
+    late_topics = watchdog.get_late_topics()
+    late_topics.clear()
+    assert watchdog.get_late_topics() == {'a'}
+
+def test_one_live_deadline_per_topic(clock, watchdog):
+    for i in range(100):
+        watchdog.topic_received('a')
+    assert watchdog.get_next_deadline() == clock.now() + datetime.timedelta(seconds=10)
+    assert len(watchdog._deadlines) == 1
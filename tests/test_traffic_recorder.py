@@ -0,0 +1,87 @@
+import hashlib
+import os
+import pytest
+import traffic_recorder
+
+MESSAGES = [
+    ('site/a', b'first', 1700000000.0),
+    ('site/b', b'', 1700000000.5),
+    ('site/a', b'x' * 300, 1700000001.25),
+    ('site/é', b'\x00\xff', 1700000002.0),
+    ('site/b', b'last', 1700000003.0),
+]
+
+def record(app_config, app_logger, tmp_path, payload_mode, messages = MESSAGES) -> str:
+    app_config.active_config['recorder']['payload_mode'] = payload_mode
+    app_config.active_config['recorder']['output_folder'] = str(tmp_path)
+    app_config.active_config['recorder']['buffer_bytes'] = 4096
+    recorder = traffic_recorder.TrafficRecorder(app_config, app_logger)
+    file_path = recorder.start()
+    for (topic, payload, timestamp) in messages:
+        recorder.record(topic, payload, timestamp)
+    recorder.stop()
+    return file_path
+
+@pytest.mark.parametrize('payload_mode, payload_kind', [
+    ('payload', traffic_recorder.TrafficRecorder.PAYLOAD_FULL),
+    ('hash', traffic_recorder.TrafficRecorder.PAYLOAD_HASH),
+    ('none', traffic_recorder.TrafficRecorder.PAYLOAD_NONE),
+])
+def test_round_trip(app_config, app_logger, tmp_path, payload_mode, payload_kind):
+    file_path = record(app_config, app_logger, tmp_path, payload_mode)
+    records = list(traffic_recorder.TrafficRecordingReader(file_path))
+    assert [(topic, timestamp) for (timestamp, topic, kind, length, data) in records] == [(topic, timestamp) for (topic, payload, timestamp) in MESSAGES]
+    assert [length for (timestamp, topic, kind, length, data) in records] == [len(payload) for (topic, payload, timestamp) in MESSAGES]
+    assert all(kind == payload_kind for (timestamp, topic, kind, length, data) in records)
+    if payload_mode == 'payload':
+        expected = [payload for (topic, payload, timestamp) in MESSAGES]
+    elif payload_mode == 'hash':
+        expected = [hashlib.blake2b(payload, digest_size=8).digest() for (topic, payload, timestamp) in MESSAGES]
+    else:
+        expected = [b''] * len(MESSAGES)
+    assert [data for (timestamp, topic, kind, length, data) in records] == expected
+
+def test_topics_are_interned(app_config, app_logger, tmp_path):
+    messages = [('site/a', b'1', 1700000000.0 + i) for i in range(100)]
+    file_path = record(app_config, app_logger, tmp_path, 'none', messages)
+    recorder = traffic_recorder.TrafficRecorder
+    topic_record_size = recorder.TOPIC_STRUCT.size + len('site/a')
+    assert os.path.getsize(file_path) == len(recorder.FILE_MAGIC) + topic_record_size + 100 * recorder.MESSAGE_STRUCT.size
+
+def test_recordings_never_share_a_file(app_config, app_logger, tmp_path):
+    file_paths = [record(app_config, app_logger, tmp_path, 'payload') for i in range(5)]
+    assert len(set(file_paths)) == 5
+    for file_path in file_paths:
+        assert len(list(traffic_recorder.TrafficRecordingReader(file_path))) == len(MESSAGES)
+
+@pytest.mark.parametrize('cut', range(1, 40))
+def test_truncated_tail_ends_cleanly(app_config, app_logger, tmp_path, cut):
+    file_path = record(app_config, app_logger, tmp_path, 'payload')
+    with open(file_path, 'rb') as file:
+        data = file.read()
+    with open(file_path, 'wb') as file:
+        file.write(data[:-cut])
+    records = list(traffic_recorder.TrafficRecordingReader(file_path))
+    # Only complete records, each with its full payload
+    assert len(records) < len(MESSAGES)
+    assert [data for (timestamp, topic, kind, length, data) in records] == [payload for (topic, payload, timestamp) in MESSAGES[:len(records)]]
+
+@pytest.mark.parametrize('content', [b'', b'MBS', b'{"not": "a recording"}', b'MBSREC1\nM'])
+def test_foreign_file_is_rejected(tmp_path, content):
+    file_path = tmp_path / 'foreign.mbsrec'
+    file_path.write_bytes(content)
+    with pytest.raises(ValueError):
+        list(traffic_recorder.TrafficRecordingReader(str(file_path)))
+
+def test_undefined_topic_id_is_corrupt(tmp_path):
+    recorder = traffic_recorder.TrafficRecorder
+    file_path = tmp_path / 'corrupt.mbsrec'
+    file_path.write_bytes(recorder.FILE_MAGIC + recorder.MESSAGE_STRUCT.pack(recorder.MESSAGE_TAG, 1700000000.0, 7, recorder.PAYLOAD_NONE, 0, 0))
+    with pytest.raises(ValueError, match='Corrupt record'):
+        list(traffic_recorder.TrafficRecordingReader(str(file_path)))
+
+def test_unknown_tag_is_corrupt(tmp_path):
+    file_path = tmp_path / 'corrupt.mbsrec'
+    file_path.write_bytes(traffic_recorder.TrafficRecorder.FILE_MAGIC + b'Zgarbage')
+    with pytest.raises(ValueError, match='Corrupt record'):
+        list(traffic_recorder.TrafficRecordingReader(str(file_path)))
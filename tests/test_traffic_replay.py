@@ -0,0 +1,69 @@
+import json
+import pytest
+
+pytest.importorskip('paho.mqtt.client')
+
+import traffic_recorder
+import traffic_replay
+
+'''
+Replay client that keeps every publish
+'''
+class CapturingMqttClient(traffic_replay.ReplayMqttClient):
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.published = list()
+
+    def mqtt_publish(self, topic, payload) -> None:
+        super().mqtt_publish(topic, payload)
+        self.published.append((topic, payload))
+
+@pytest.fixture
+def recording(app_config, app_logger, tmp_path):
+    app_config.active_config['recorder']['payload_mode'] = 'hash'
+    app_config.active_config['recorder']['output_folder'] = str(tmp_path)
+    recorder = traffic_recorder.TrafficRecorder(app_config, app_logger)
+    file_path = recorder.start()
+    start = 1700000000.0
+    # 'a' every 0.1s with a 3s gap; 'b' once
+    messages = [(start + i * 0.1, 'a', b'payload-%d' % i) for i in list(range(10)) + list(range(40, 60))]
+    messages.append((start + 0.05, 'b', b'x' * 50))
+    for (timestamp, topic, payload) in sorted(messages):
+        recorder.record(topic, payload, timestamp)
+    recorder.stop()
+    return file_path
+
+def replay(app_config, app_logger, file_path, speed):
+    app_config.active_config['profiler']['enabled'] = False
+    app_config.active_config['topic_watchdog']['all']['max_time_seconds'] = 1
+    app_config.active_config['watchdog_events']['recovery_hold_seconds'] = 1
+    mqtt_client = CapturingMqttClient()
+    stats = traffic_replay.TrafficReplayer(app_config, app_logger, file_path, speed, mqtt_client).run()
+    events = [json.loads(payload) for (topic, payload) in mqtt_client.published if topic.endswith('/watchdog_events')]
+    return (stats, events, mqtt_client.published)
+
+def test_replay_transitions(app_config, app_logger, recording):
+    (stats, events, published) = replay(app_config, app_logger, recording, 0)
+    assert stats['messages'] == 31
+    assert [(event['topic'], event['previous_state'], event['state']) for event in events] == [
+        ('b', 'OK', 'LATE'),
+        ('a', 'OK', 'LATE'),
+        ('a', 'LATE', 'RECOVERED'),
+        ('a', 'RECOVERED', 'OK'),
+    ]
+    assert [event['delta_seconds'] for event in events if event['state'] == 'LATE'] == [1.0, 1.0]
+
+def test_replay_does_not_depend_on_speed(app_config, app_logger, recording):
+    (max_stats, max_events, max_published) = replay(app_config, app_logger, recording, 0)
+    (paced_stats, paced_events, paced_published) = replay(app_config, app_logger, recording, 20)
+    assert paced_stats['wall_seconds'] >= 5.0 / 20
+    assert paced_events == max_events
+    assert paced_published == max_published
+
+def test_zero_interval_disables_job(app_config, app_logger, recording):
+    app_config.active_config['scheduler']['stats_seconds'] = 0
+    (stats, events, published) = replay(app_config, app_logger, recording, 0)
+    assert stats['messages'] == 31
+    assert not any(topic.endswith('/process_stats') for (topic, payload) in published)
+    assert any(topic.endswith('/topic_list') for (topic, payload) in published)